@@ -2,18 +2,21 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
-from .config import Config
+from .config import get_config
 
 db = SQLAlchemy()
 jwt = JWTManager()
 
-def create_app(config_class=Config):
+def create_app(config_class=None):
     app = Flask(__name__)
-    app.config.from_object(config_class)
+    app.config.from_object(config_class or get_config())
     
     db.init_app(app)
     jwt.init_app(app)
     
+    from .instrumentation import init_instrumentation
+    init_instrumentation(app)
+    
     # Configure CORS to allow requests from React frontend
     CORS(app, resources={
         r"/api/*": {
@@ -24,13 +27,20 @@ def create_app(config_class=Config):
         }
     })
     
-    from .routes import auth, resumes, jobs, evaluation
+    from .routes import auth, resumes, jobs, evaluation, metrics
     app.register_blueprint(auth.bp)
     app.register_blueprint(resumes.bp)
     app.register_blueprint(jobs.bp)
     app.register_blueprint(evaluation.bp)
+    app.register_blueprint(metrics.bp)
+    
+    from .commands import register_commands
+    register_commands(app)
     
+    # Schema changes are left to the init-db command, so starting a worker
+    # never touches the schema
+    from .database import configure_database
     with app.app_context():
-        db.create_all()
+        configure_database(app)
     
     return app
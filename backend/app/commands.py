@@ -0,0 +1,152 @@
+import click
+import os
+from collections import Counter
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import undefer
+from app import db
+from app.models import Resume, DocumentFrequency, StoredFile
+from app.database import init_database
+from app.utils.candidate_index import build_candidate_index, corpus_signature, index_path
+from app.utils.nlp_engine import decode_term_vector
+from app.utils.search_index import search_supported, rebuild_search_index
+from app.utils.term_vectors import build_term_vector, assign_term_vector
+
+@click.command('init-db')
+@with_appcontext
+def init_db_command():
+    """Create or upgrade the database schema; run before starting the app."""
+    init_database()
+    click.echo('Database schema is up to date')
+
+@click.command('backfill-term-vectors')
+@click.option('--batch-size', default=200, show_default=True, help='Resumes per commit')
+@click.option('--all', 'rebuild_all', is_flag=True, help='Recompute vectors that already exist, e.g. after editing SKILLS_FILE')
+@with_appcontext
+def backfill_term_vectors_command(batch_size, rebuild_all):
+    """Compute stored term vectors for existing resumes."""
+    query = Resume.query.options(undefer(Resume.extracted_text))
+    if not rebuild_all:
+        query = query.filter(Resume.term_vector.is_(None))
+    
+    updated = 0
+    last_id = 0
+    while True:
+        batch = query.filter(Resume.id > last_id).order_by(Resume.id).limit(batch_size).all()
+        if not batch:
+            break
+        
+        for resume in batch:
+            assign_term_vector(resume, build_term_vector(resume.extracted_text))
+        db.session.commit()
+        
+        updated += len(batch)
+        last_id = batch[-1].id
+        click.echo(f'Backfilled {updated} resumes')
+    
+    if rebuild_all:
+        # Deduplicated uploads reuse the vector cached with their stored file
+        refreshed = 0
+        last_hash = ''
+        while True:
+            batch = StoredFile.query.options(undefer(StoredFile.extracted_text)).filter(
+                StoredFile.sha256 > last_hash
+            ).order_by(StoredFile.sha256).limit(batch_size).all()
+            if not batch:
+                break
+            
+            for stored in batch:
+                stored.term_vector = build_term_vector(stored.extracted_text)
+            db.session.commit()
+            
+            refreshed += len(batch)
+            last_hash = batch[-1].sha256
+        click.echo(f'Refreshed {refreshed} stored file vectors')
+    
+    click.echo(f'Done: {updated} resumes updated')
+
+@click.command('rebuild-search-index')
+@with_appcontext
+def rebuild_search_index_command():
+    """Re-index every resume for full-text search."""
+    if not search_supported():
+        raise click.ClickException('Full-text search requires SQLite with FTS5')
+    click.echo(f'Indexed {rebuild_search_index()} resumes')
+
+@click.command('rebuild-document-frequencies')
+@click.option('--batch-size', default=500, show_default=True, help='Resume vectors read per round trip')
+@with_appcontext
+def rebuild_document_frequencies_command(batch_size):
+    """Recompute every user's document frequencies from stored term vectors."""
+    DocumentFrequency.query.delete()
+    
+    user_ids = [user_id for (user_id,) in db.session.query(Resume.user_id).distinct()]
+    for user_id in user_ids:
+        doc_counts = Counter()
+        vectors = db.session.query(Resume.term_vector).filter(
+            Resume.user_id == user_id,
+            Resume.term_vector.isnot(None)
+        ).yield_per(batch_size)
+        for (term_vector,) in vectors:
+            doc_counts.update(decode_term_vector(term_vector).keys())
+        
+        if doc_counts:
+            db.session.execute(insert(DocumentFrequency), [
+                {'user_id': user_id, 'term_id': term_id, 'doc_count': doc_count}
+                for term_id, doc_count in doc_counts.items()
+            ])
+        click.echo(f'User {user_id}: {len(doc_counts)} terms')
+    
+    db.session.commit()
+    click.echo(f'Done: {len(user_ids)} users rebuilt')
+
+@click.command('build-candidate-indexes')
+@with_appcontext
+def build_candidate_indexes_command():
+    """Write every user's memory-mapped candidate index, e.g. before a deploy."""
+    index_dir = current_app.config['INDEX_DIR']
+    os.makedirs(index_dir, exist_ok=True)
+    
+    user_ids = [user_id for (user_id,) in db.session.query(Resume.user_id).distinct()]
+    for user_id in user_ids:
+        index = build_candidate_index(user_id, corpus_signature(user_id))
+        index.save(index_path(index_dir, user_id))
+        click.echo(f'User {user_id}: {len(index.terms)} terms, {len(index.indices)} postings')
+    
+    click.echo(f'Done: {len(user_ids)} indexes written')
+
+@click.command('compress-extracted-text')
+@click.option('--batch-size', default=500, show_default=True, help='Rows rewritten per commit')
+@with_appcontext
+def compress_extracted_text_command(batch_size):
+    """Rewrite extracted text stored before compression in compressed form."""
+    for model in (Resume, StoredFile):
+        table = model.__table__
+        key = table.primary_key.columns.values()[0]
+        rewritten = 0
+        last_key = None
+        while True:
+            query = select(key, model.extracted_text).order_by(key).limit(batch_size)
+            if last_key is not None:
+                query = query.where(key > last_key)
+            rows = db.session.execute(query).all()
+            if not rows:
+                break
+            
+            db.session.execute(update(model), [{key.name: row[0], 'extracted_text': row[1]} for row in rows])
+            db.session.commit()
+            rewritten += len(rows)
+            last_key = rows[-1][0]
+        click.echo(f'{table.name}: {rewritten} rows rewritten')
+    
+    if db.engine.dialect.name == 'sqlite':
+        click.echo('Run VACUUM to return the freed space to the file system')
+
+def register_commands(app):
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(backfill_term_vectors_command)
+    app.cli.add_command(rebuild_document_frequencies_command)
+    app.cli.add_command(rebuild_search_index_command)
+    app.cli.add_command(build_candidate_indexes_command)
+    app.cli.add_command(compress_extracted_text_command)
@@ -1,12 +1,72 @@
 import os
 from datetime import timedelta
 
+def database_url():
+    url = os.environ.get('DATABASE_URL') or 'sqlite:///resume_screener.db'
+    # Some hosts still hand out the postgres:// scheme SQLAlchemy no longer accepts
+    if url.startswith('postgres://'):
+        url = 'postgresql://' + url[len('postgres://'):]
+    return url
+
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
-    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///resume_screener.db'
+    SQLALCHEMY_DATABASE_URI = database_url()
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-key-change-in-production'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
-    MAX_CONTENT_LENGTH = 5 * 1024 * 1024  # 5MB max file size
+    MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB max per resume file
+    MAX_CONTENT_LENGTH = 100 * 1024 * 1024  # 100MB max request size, sized for bulk uploads
     UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'uploads')
     ALLOWED_EXTENSIONS = {'pdf', 'txt'}
+    PDF_MAX_PAGES = 50  # pages read per PDF, later pages are ignored
+    MAX_EXTRACTED_CHARS = 200000  # characters of text kept per resume
+    PDF_TIME_BUDGET = 10  # seconds spent extracting one PDF before stopping
+    EVALUATION_WORKERS = int(os.environ.get('EVALUATION_WORKERS', 2))  # background evaluation threads
+    EVALUATION_CHUNK_SIZE = 200  # resumes scored per commit in background and streamed evaluations
+    IDF_DRIFT_TOLERANCE = float(os.environ.get('IDF_DRIFT_TOLERANCE', 0.1))  # relative change in resume count before evaluations are rescored
+    EVALUATION_TASK_HEARTBEAT_TIMEOUT = timedelta(minutes=10)  # active tasks with no progress for this long are marked failed
+    SKILLS_FILE = os.environ.get('SKILLS_FILE', os.path.join(os.path.dirname(__file__), 'data', 'skills.txt'))  # skill phrase dictionary, empty to match single words only
+    PREFILTER_QUERY_TERMS = 32  # heaviest job terms looked up when shortlisting candidates
+    INDEX_DIR = os.environ.get('INDEX_DIR') or os.path.join(os.path.dirname(os.path.dirname(__file__)), 'indexes')  # memory-mapped candidate indexes, shared by workers
+    BULK_IMPORT_WORKERS = int(os.environ.get('BULK_IMPORT_WORKERS', 0))  # extraction processes per server process, 0 = a share of BULK_IMPORT_HOST_WORKERS
+    BULK_IMPORT_HOST_WORKERS = int(os.environ.get('BULK_IMPORT_HOST_WORKERS', os.cpu_count() or 1))  # extraction processes split between all server processes (WEB_CONCURRENCY)
+    BULK_IMPORT_BATCH_SIZE = 100  # resumes inserted per commit in bulk imports
+    BULK_UPLOAD_MAX_FILES = 500  # files accepted per bulk upload, counting ZIP members
+    RESPONSE_CACHE_SIZE = 256  # serialized GET responses kept per process for ETag hits
+    RESPONSE_CACHE_MAX_BYTES = int(os.environ.get('RESPONSE_CACHE_MAX_BYTES', 32 * 1024 * 1024))  # total size of those responses per process
+    RESPONSE_CACHE_MAX_BODY_BYTES = 1024 * 1024  # larger responses are not kept, but still get ETags and 304s
+    SERVER_TIMING_HEADER = True  # report per-stage timings in a Server-Timing response header
+    METRICS_ALLOW_REMOTE = os.environ.get('METRICS_ALLOW_REMOTE', '').lower() == 'true'  # /api/metrics is local-only otherwise
+    PROFILE_ENDPOINTS = {name for name in os.environ.get('PROFILE_ENDPOINTS', '').split(',') if name}  # e.g. evaluation.evaluate_resumes
+    PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))  # fraction of PROFILE_ENDPOINTS requests to profile
+    PROFILE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'profiles')
+    SQLITE_PRAGMAS = {}  # PRAGMA name -> value applied to every new SQLite connection
+
+class ProductionConfig(Config):
+    # WAL lets evaluations read while uploads write, and NORMAL sync is
+    # durable under WAL except for the last commits on power loss
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+        'cache_size': -int(os.environ.get('SQLITE_CACHE_KB', 64000)),  # negative values are KiB
+        'temp_store': 'MEMORY'
+    }
+    # Pool sizing only applies to server databases such as PostgreSQL; size
+    # DB_POOL_SIZE + DB_MAX_OVERFLOW per process to the server's connection limit
+    SQLALCHEMY_ENGINE_OPTIONS = {} if Config.SQLALCHEMY_DATABASE_URI.startswith('sqlite') else {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': True
+    }
+
+CONFIGS = {
+    'development': Config,
+    'production': ProductionConfig
+}
+
+def get_config():
+    """Config class selected by the APP_ENV environment variable"""
+    return CONFIGS[os.environ.get('APP_ENV', 'development')]
@@ -0,0 +1,38 @@
+from sqlalchemy import event, inspect
+from app import db
+from app.schema import upgrade_schema
+
+# Values per IN (...) list, well under SQLite's bound-parameter limit
+IN_CHUNK_SIZE = 500
+
+def configure_database(app):
+    """Apply the configured SQLite pragmas to every new connection"""
+    pragmas = app.config['SQLITE_PRAGMAS']
+    if not pragmas or db.engine.dialect.name != 'sqlite':
+        return
+    
+    @event.listens_for(db.engine, 'connect')
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+def init_database():
+    """
+    Create missing tables, then add columns and indexes missing from existing
+    ones, and the full-text search index on SQLite
+    """
+    from app.utils.evaluations import remove_duplicate_evaluations
+    from app.utils.search_index import create_search_index
+    
+    inspector = inspect(db.engine)
+    if 'evaluations' in inspector.get_table_names() and 'ix_evaluations_job_id_resume_id' not in {
+        index['name'] for index in inspector.get_indexes('evaluations')
+    }:
+        # The unique index cannot be created over duplicates
+        remove_duplicate_evaluations()
+    
+    db.create_all()
+    upgrade_schema()
+    create_search_index()
@@ -0,0 +1,193 @@
+import cProfile
+import os
+import random
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from flask import g, request, has_request_context
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Upper bounds (ms) of the latency histogram buckets; a final +Inf bucket catches the rest
+HISTOGRAM_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+class Histogram:
+    def __init__(self):
+        self.bucket_counts = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+    
+    def observe(self, value_ms):
+        self.bucket_counts[bisect_left(HISTOGRAM_BUCKETS_MS, value_ms)] += 1
+        self.count += 1
+        self.total_ms += value_ms
+    
+    def to_dict(self):
+        # Cumulative "less than or equal" counts, as Prometheus histograms report them
+        buckets = {}
+        running = 0
+        for bound, count in zip(HISTOGRAM_BUCKETS_MS + ('+Inf',), self.bucket_counts):
+            running += count
+            buckets[str(bound)] = running
+        return {
+            'count': self.count,
+            'sum_ms': round(self.total_ms, 3),
+            'buckets': buckets
+        }
+
+class MetricsRegistry:
+    """Process-wide request counters and per-endpoint, per-stage latency histograms"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        with self.lock:
+            self.started_at = time.time()
+            self.requests = {}
+            self.db_queries = {}
+            self.latency = {}
+    
+    def observe_request(self, endpoint, status_code, total_ms, stages):
+        with self.lock:
+            statuses = self.requests.setdefault(endpoint, {})
+            statuses[status_code] = statuses.get(status_code, 0) + 1
+            
+            histograms = self.latency.setdefault(endpoint, {})
+            histograms.setdefault('total', Histogram()).observe(total_ms)
+            for name, (elapsed, count) in stages.items():
+                histograms.setdefault(name, Histogram()).observe(elapsed * 1000)
+                if name == 'db':
+                    self.db_queries[endpoint] = self.db_queries.get(endpoint, 0) + count
+    
+    def snapshot(self):
+        with self.lock:
+            return {
+                'uptime_seconds': round(time.time() - self.started_at, 3),
+                'pid': os.getpid(),
+                'requests': {endpoint: {str(status): count for status, count in statuses.items()} for endpoint, statuses in self.requests.items()},
+                'db_queries': dict(self.db_queries),
+                'latency_ms': {
+                    endpoint: {name: histogram.to_dict() for name, histogram in histograms.items()}
+                    for endpoint, histograms in self.latency.items()
+                }
+            }
+
+metrics = MetricsRegistry()
+
+def record_stage(name, elapsed):
+    """Add elapsed seconds to a stage of the current request; a no-op outside requests"""
+    if not has_request_context():
+        return
+    timings = g.setdefault('stage_timings', {})
+    total, count = timings.get(name, (0.0, 0))
+    timings[name] = (total + elapsed, count + 1)
+
+@contextmanager
+def stage(name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - started)
+
+def timed(name):
+    """Decorator recording each call of a function as a request stage"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+class TimedJSONProvider(DefaultJSONProvider):
+    def dumps(self, obj, **kwargs):
+        with stage('serialize'):
+            return super().dumps(obj, **kwargs)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_started'].pop()
+    record_stage('db', time.perf_counter() - started)
+
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get('query_started'):
+        connection.info['query_started'].pop()
+
+def _start_profiler():
+    # Prefer the pyinstrument sampling profiler when installed
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already active in this process
+            return None
+        return profiler
+    
+    profiler = Profiler()
+    profiler.start()
+    return profiler
+
+def _save_profile(profiler, profile_dir, endpoint):
+    os.makedirs(profile_dir, exist_ok=True)
+    basename = os.path.join(profile_dir, f"{endpoint}-{datetime.utcnow().strftime('%Y%m%d_%H%M%S_%f')}")
+    if isinstance(profiler, cProfile.Profile):
+        profiler.disable()
+        profiler.dump_stats(basename + '.prof')
+    else:
+        profiler.stop()
+        with open(basename + '.html', 'w') as f:
+            f.write(profiler.output_html())
+
+def init_instrumentation(app):
+    """Record per-stage request timings, expose them as Server-Timing and aggregate them"""
+    app.json = TimedJSONProvider(app)
+    
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'handle_error', _handle_error)
+    
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+        g.stage_timings = {}
+        
+        if request.endpoint in app.config['PROFILE_ENDPOINTS'] and random.random() < app.config['PROFILE_SAMPLE_RATE']:
+            g.profiler = _start_profiler()
+    
+    @app.after_request
+    def report_request_timings(response):
+        if 'request_started' not in g:
+            return response
+        
+        total_ms = (time.perf_counter() - g.request_started) * 1000
+        timings = g.get('stage_timings', {})
+        endpoint = request.endpoint or 'unmatched'
+        
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            _save_profile(profiler, app.config['PROFILE_DIR'], endpoint)
+        
+        if app.config['SERVER_TIMING_HEADER']:
+            entries = [
+                f'{name};dur={elapsed * 1000:.2f};desc="{count} calls"'
+                for name, (elapsed, count) in timings.items()
+            ]
+            entries.append(f'total;dur={total_ms:.2f}')
+            response.headers['Server-Timing'] = ', '.join(entries)
+        
+        metrics.observe_request(endpoint, response.status_code, total_ms, timings)
+        return response
@@ -2,5 +2,9 @@ from .user import User
 from .resume import Resume
 from .job import Job
 from .evaluation import Evaluation
+from .term import Term
+from .evaluation_task import EvaluationTask
+from .document_frequency import DocumentFrequency
+from .stored_file import StoredFile
 
-__all__ = ['User', 'Resume', 'Job', 'Evaluation']
+__all__ = ['User', 'Resume', 'Job', 'Evaluation', 'Term', 'EvaluationTask', 'DocumentFrequency', 'StoredFile']
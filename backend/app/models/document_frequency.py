@@ -0,0 +1,16 @@
+from app import db
+
+class DocumentFrequency(db.Model):
+    __tablename__ = 'document_frequencies'
+    
+    # Number of a user's resumes whose term vector contains the term
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True, autoincrement=False)
+    term_id = db.Column(db.Integer, db.ForeignKey('terms.id'), primary_key=True, autoincrement=False)
+    doc_count = db.Column(db.Integer, nullable=False, default=0)
+    
+    def to_dict(self):
+        return {
+            'user_id': self.user_id,
+            'term_id': self.term_id,
+            'doc_count': self.doc_count
+        }
@@ -6,10 +6,13 @@ class Evaluation(db.Model):
     __tablename__ = 'evaluations'
     
     id = db.Column(db.Integer, primary_key=True)
-    job_id = db.Column(db.Integer, db.ForeignKey('jobs.id'), nullable=False)
-    resume_id = db.Column(db.Integer, db.ForeignKey('resumes.id'), nullable=False)
+    job_id = db.Column(db.Integer, db.ForeignKey('jobs.id'), nullable=False)  # indexed by ix_evaluations_job_id_fit_score
+    resume_id = db.Column(db.Integer, db.ForeignKey('resumes.id'), nullable=False, index=True)
     fit_score = db.Column(db.Float, nullable=False)
     matching_keywords = db.Column(db.Text, nullable=False)  # JSON string
+    job_hash = db.Column(db.String(64))  # SHA-256 of the job description that was scored
+    resume_hash = db.Column(db.String(64))  # SHA-256 of the resume text that was scored
+    corpus_size = db.Column(db.Integer)  # resumes in the user's corpus whose IDF weighted the score
     evaluated_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     def set_keywords(self, keywords_list):
@@ -27,3 +30,9 @@ class Evaluation(db.Model):
             'matching_keywords': self.get_keywords(),
             'evaluated_at': self.evaluated_at.isoformat()
         }
+
+# Serves ranked result pages per job straight from the index
+db.Index('ix_evaluations_job_id_fit_score', Evaluation.job_id, Evaluation.fit_score.desc(), Evaluation.id)
+# One evaluation per job and resume, so overlapping evaluate calls cannot
+# both insert one
+db.Index('ix_evaluations_job_id_resume_id', Evaluation.job_id, Evaluation.resume_id, unique=True)
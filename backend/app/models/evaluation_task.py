@@ -0,0 +1,52 @@
+import uuid
+from datetime import datetime
+from app import db
+
+class EvaluationTask(db.Model):
+    __tablename__ = 'evaluation_tasks'
+    
+    PENDING = 'pending'
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+    
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    job_id = db.Column(db.Integer, db.ForeignKey('jobs.id'), nullable=False, index=True)
+    status = db.Column(db.String(20), nullable=False, default=PENDING)
+    total = db.Column(db.Integer, nullable=False, default=0)
+    processed = db.Column(db.Integer, nullable=False, default=0)
+    rescore = db.Column(db.Boolean, default=False)  # rescore every resume, not just new or changed ones
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # heartbeat, refreshed by every progress commit
+    finished_at = db.Column(db.DateTime)
+    
+    @property
+    def is_active(self):
+        return self.status in (self.PENDING, self.RUNNING)
+    
+    def expire_if_stale(self, timeout):
+        """Mark an active task failed once its heartbeat is older than timeout, e.g. after its process died"""
+        heartbeat = self.updated_at or self.created_at
+        if not self.is_active or heartbeat >= datetime.utcnow() - timeout:
+            return False
+        
+        self.status = self.FAILED
+        self.error = 'Task stopped reporting progress and was abandoned'
+        self.finished_at = datetime.utcnow()
+        return True
+    
+    def to_dict(self):
+        return {
+            'task_id': self.id,
+            'job_id': self.job_id,
+            'status': self.status,
+            'total': self.total,
+            'processed': self.processed,
+            'progress': round(self.processed / self.total * 100, 2) if self.total else (100.0 if self.status == self.COMPLETED else 0.0),
+            'error': self.error,
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
@@ -5,13 +5,14 @@ class Job(db.Model):
     __tablename__ = 'jobs'
     
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     title = db.Column(db.String(255), nullable=False)
     description = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     evaluations = db.relationship('Evaluation', backref='job', lazy=True, cascade='all, delete-orphan')
+    evaluation_tasks = db.relationship('EvaluationTask', backref='job', lazy=True, cascade='all, delete-orphan')
     
     def to_dict(self):
         return {
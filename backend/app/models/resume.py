@@ -1,14 +1,18 @@
 from datetime import datetime
 from app import db
+from app.models.types import CompressedText
 
 class Resume(db.Model):
     __tablename__ = 'resumes'
     
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     filename = db.Column(db.String(255), nullable=False)
     file_path = db.Column(db.String(500), nullable=False)
-    extracted_text = db.Column(db.Text, nullable=False)
+    content_hash = db.Column(db.String(64), db.ForeignKey('stored_files.sha256'))  # SHA-256 of the uploaded file
+    extracted_text = db.deferred(db.Column(CompressedText, nullable=False))  # loaded on first access
+    text_hash = db.Column(db.String(64))  # SHA-256 of extracted_text
+    term_vector = db.Column(db.LargeBinary)  # encoded {term_id: count}, see nlp_engine.encode_term_vector
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     evaluations = db.relationship('Evaluation', backref='resume', lazy=True, cascade='all, delete-orphan')
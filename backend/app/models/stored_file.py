@@ -0,0 +1,24 @@
+from datetime import datetime
+from app import db
+from app.models.types import CompressedText
+
+class StoredFile(db.Model):
+    __tablename__ = 'stored_files'
+    
+    # Uploaded content stored once per user under a SHA-256 of the owner and
+    # the content, with its extraction cached
+    sha256 = db.Column(db.String(64), primary_key=True)
+    file_path = db.Column(db.String(500), nullable=False)
+    size = db.Column(db.Integer, nullable=False)
+    extracted_text = db.deferred(db.Column(CompressedText, nullable=False))
+    term_vector = db.Column(db.LargeBinary, nullable=False)
+    ref_count = db.Column(db.Integer, nullable=False, default=0)  # resumes pointing at this file
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'sha256': self.sha256,
+            'size': self.size,
+            'ref_count': self.ref_count,
+            'created_at': self.created_at.isoformat()
+        }
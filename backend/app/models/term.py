@@ -0,0 +1,13 @@
+from app import db
+
+class Term(db.Model):
+    __tablename__ = 'terms'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    text = db.Column(db.String(255), unique=True, nullable=False)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'text': self.text
+        }
@@ -0,0 +1,29 @@
+import zlib
+from app import db
+
+# Leading byte of a compressed value; text stored before compression was
+# introduced comes back as a plain string and is returned unchanged
+ZLIB_FORMAT = b'\x01'
+
+class CompressedText(db.TypeDecorator):
+    """Unicode text stored zlib-compressed in a binary column"""
+    
+    impl = db.LargeBinary
+    cache_ok = True
+    
+    def __init__(self, level=6):
+        super().__init__()
+        self.level = level
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return ZLIB_FORMAT + zlib.compress(value.encode('utf-8'), self.level)
+    
+    def process_result_value(self, value, dialect):
+        if value is None or isinstance(value, str):
+            return value
+        value = bytes(value)
+        if value[:1] == ZLIB_FORMAT:
+            return zlib.decompress(value[1:]).decode('utf-8')
+        return value.decode('utf-8')
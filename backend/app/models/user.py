@@ -9,6 +9,10 @@ class User(db.Model):
     email = db.Column(db.String(120), unique=True, nullable=False, index=True)
     password_hash = db.Column(db.String(255), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Bumped by every write to the user's data of that kind; see utils.http_cache
+    resumes_version = db.Column(db.Integer, default=0)
+    jobs_version = db.Column(db.Integer, default=0)
+    evaluations_version = db.Column(db.Integer, default=0)
     
     resumes = db.relationship('Resume', backref='user', lazy=True, cascade='all, delete-orphan')
     jobs = db.relationship('Job', backref='user', lazy=True, cascade='all, delete-orphan')
@@ -1,11 +1,117 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, current_app, url_for, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from werkzeug.utils import secure_filename
 from app import db
-from app.models import Job, Resume, Evaluation
-from app.utils.nlp_engine import calculate_fit_score, extract_matching_keywords
+from app.models import Job, Resume, Evaluation, EvaluationTask
+from sqlalchemy import or_, and_
+from sqlalchemy.orm import load_only
+from app.utils.evaluations import prune_stale_evaluations, add_evaluations, add_job_evaluations, stream_evaluations
+from app.utils.term_vectors import score_jobs_for_resumes, fill_term_vectors
+from app.utils.candidate_index import shortlist_resume_ids
+from app.utils.http_cache import cached_response
+from app.utils.task_runner import submit_evaluation_task
+from datetime import datetime
+import csv
+import json
+import base64
+import heapq
 
 bp = Blueprint('evaluation', __name__, url_prefix='/api/evaluate')
 
+STREAM_MIMETYPES = {
+    'ndjson': 'application/x-ndjson',
+    'sse': 'text/event-stream'
+}
+
+# Result rows fetched per round trip while streaming or exporting
+RESULT_BATCH_SIZE = 1000
+
+EXPORT_COLUMNS = ['rank', 'resume_id', 'filename', 'fit_score', 'matching_keywords', 'evaluated_at']
+
+class CSVLine:
+    """File-like target for csv.writer that hands back each written line"""
+    
+    def write(self, line):
+        return line
+
+def csv_cell(value):
+    # Spreadsheets run cells starting with these characters as formulas
+    if isinstance(value, str) and value[:1] in ('=', '+', '-', '@'):
+        return "'" + value
+    return value
+
+def results_query(job_id, user_id):
+    # One joined query loading only the returned columns, already ranked
+    # by the (job_id, fit_score DESC, id) index
+    return db.session.query(
+        Evaluation.id,
+        Evaluation.resume_id,
+        Resume.filename,
+        Evaluation.fit_score,
+        Evaluation.matching_keywords,
+        Evaluation.evaluated_at
+    ).join(Resume, Resume.id == Evaluation.resume_id).filter(
+        Evaluation.job_id == job_id,
+        Resume.user_id == user_id
+    ).order_by(Evaluation.fit_score.desc(), Evaluation.id)
+
+def serialize_result(row):
+    return {
+        'resume_id': row.resume_id,
+        'filename': row.filename,
+        'fit_score': row.fit_score,
+        'matching_keywords': json.loads(row.matching_keywords),
+        'evaluated_at': row.evaluated_at.isoformat()
+    }
+
+def build_results(job_id, user_id):
+    return [serialize_result(row) for row in results_query(job_id, user_id)]
+
+def encode_cursor(row, served):
+    payload = json.dumps({'score': row.fit_score, 'id': row.id, 'served': served})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+def decode_cursor(cursor):
+    payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    return float(payload['score']), int(payload['id']), int(payload['served'])
+
+def parse_positive_int(name):
+    value = request.args.get(name)
+    if value is None:
+        return None
+    value = int(value)
+    if value < 1:
+        raise ValueError(f'{name} must be a positive integer')
+    return value
+
+def format_message(stream_format, event, data):
+    if stream_format == 'sse':
+        return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    return json.dumps(dict(data, type=event)) + '\n'
+
+def start_evaluation_task(job, user_id, rescore=False):
+    # Reuse a live task already scoring this job the same way instead of
+    # racing it; tasks whose heartbeat stopped are failed, not reused
+    timeout = current_app.config['EVALUATION_TASK_HEARTBEAT_TIMEOUT']
+    active = EvaluationTask.query.filter(
+        EvaluationTask.job_id == job.id,
+        EvaluationTask.status.in_([EvaluationTask.PENDING, EvaluationTask.RUNNING])
+    ).all()
+    live = [task for task in active if not task.expire_if_stale(timeout)]
+    task = next((task for task in live if bool(task.rescore) == rescore), None)
+    
+    if task:
+        db.session.commit()
+    else:
+        task = EvaluationTask(user_id=user_id, job_id=job.id, rescore=rescore)
+        db.session.add(task)
+        db.session.commit()
+        submit_evaluation_task(current_app._get_current_object(), task.id)
+    
+    response = jsonify(task.to_dict())
+    response.headers['Location'] = url_for('evaluation.get_evaluation_task', task_id=task.id)
+    return response, 202
+
 @bp.route('', methods=['POST'])
 @jwt_required()
 def evaluate_resumes():
@@ -21,41 +127,38 @@ def evaluate_resumes():
         if not job:
             return jsonify({'error': 'Not Found', 'message': 'Job not found'}), 404
         
-        resumes = Resume.query.filter_by(user_id=user_id).all()
+        candidates = data.get('candidates')
+        if candidates is not None and (not isinstance(candidates, int) or isinstance(candidates, bool) or candidates < 1):
+            return jsonify({'error': 'Bad Request', 'message': 'candidates must be a positive integer'}), 400
+        if candidates is not None and data.get('async'):
+            return jsonify({'error': 'Bad Request', 'message': 'candidates cannot be combined with async'}), 400
+        
+        # Only ids and hashes are needed up front; term vectors are streamed in chunks while scoring
+        resumes = Resume.query.filter_by(user_id=user_id).options(load_only(Resume.id, Resume.text_hash)).all()
         
         if not resumes:
             return jsonify({'error': 'Bad Request', 'message': 'No resumes found to evaluate'}), 400
         
-        Evaluation.query.filter_by(job_id=job_id).delete()
+        rescore = bool(data.get('rescore'))
+        if data.get('async'):
+            return start_evaluation_task(job, user_id, rescore)
         
-        results = []
-        for resume in resumes:
-            fit_score = calculate_fit_score(resume.extracted_text, job.description)
-            matching_keywords = extract_matching_keywords(resume.extracted_text, job.description)
-            
-            evaluation = Evaluation(
-                job_id=job_id,
-                resume_id=resume.id,
-                fit_score=fit_score
+        # Only resumes that are new or changed since the last run get scored,
+        # unless a full rescore was requested
+        pending_ids = [resume.id for resume in prune_stale_evaluations(job, resumes, rescore)]
+        if candidates is not None:
+            # Score exactly only the pending resumes the inverted index
+            # shortlists; the rest stay pending for a later full run
+            shortlist = shortlist_resume_ids(
+                job.description, user_id, candidates,
+                current_app.config['PREFILTER_QUERY_TERMS'], current_app.config['INDEX_DIR']
             )
-            evaluation.set_keywords(matching_keywords)
-            db.session.add(evaluation)
-        
+            pending_ids = [resume_id for resume_id in pending_ids if resume_id in shortlist]
+        add_evaluations(job, pending_ids, current_app.config['EVALUATION_CHUNK_SIZE'])
         db.session.commit()
         
         # Build results after commit so evaluated_at is populated
-        evaluations = Evaluation.query.filter_by(job_id=job_id).all()
-        for evaluation in evaluations:
-            resume = Resume.query.get(evaluation.resume_id)
-            results.append({
-                'resume_id': resume.id,
-                'filename': resume.filename,
-                'fit_score': evaluation.fit_score,
-                'matching_keywords': evaluation.get_keywords(),
-                'evaluated_at': evaluation.evaluated_at.isoformat()
-            })
-        
-        results.sort(key=lambda x: x['fit_score'], reverse=True)
+        results = build_results(job_id, user_id)
         
         return jsonify({
             'job_id': job_id,
@@ -66,38 +169,325 @@ def evaluate_resumes():
         db.session.rollback()
         return jsonify({'error': 'Internal Server Error', 'message': str(e)}), 500
 
-@bp.route('/<int:job_id>', methods=['GET'])
+@bp.route('/batch', methods=['POST'])
 @jwt_required()
-def get_evaluation_results(job_id):
+def evaluate_jobs():
     try:
         user_id = get_jwt_identity()
+        data = request.get_json()
         
-        job = Job.query.filter_by(id=job_id, user_id=user_id).first()
-        if not job:
+        job_ids = data.get('job_ids')
+        if not isinstance(job_ids, list) or not job_ids or not all(isinstance(job_id, int) for job_id in job_ids):
+            return jsonify({'error': 'Bad Request', 'message': 'job_ids must be a non-empty list of job ids'}), 400
+        
+        top_k = data.get('top_k')
+        if top_k is not None and (not isinstance(top_k, int) or isinstance(top_k, bool) or top_k < 1):
+            return jsonify({'error': 'Bad Request', 'message': 'top_k must be a positive integer'}), 400
+        
+        job_ids = list(dict.fromkeys(job_ids))
+        jobs = Job.query.filter(Job.id.in_(job_ids), Job.user_id == user_id).all()
+        if len(jobs) != len(job_ids):
             return jsonify({'error': 'Not Found', 'message': 'Job not found'}), 404
+        positions = {job_id: position for position, job_id in enumerate(job_ids)}
+        jobs.sort(key=lambda job: positions[job.id])
         
-        evaluations = Evaluation.query.filter_by(job_id=job_id).join(Resume).filter(Resume.user_id == user_id).all()
+        resumes = Resume.query.filter_by(user_id=user_id).all()
         
-        if not evaluations:
-            return jsonify({'error': 'Not Found', 'message': 'No evaluation results found for this job'}), 404
+        if not resumes:
+            return jsonify({'error': 'Bad Request', 'message': 'No resumes found to evaluate'}), 400
+        
+        # Each job keeps its own incremental state; everything still pending
+        # is scored together in one matrix product
+        rescore = bool(data.get('rescore'))
+        pending = [prune_stale_evaluations(job, resumes, rescore) for job in jobs]
+        add_job_evaluations(jobs, pending)
+        db.session.commit()
         
         results = []
-        for evaluation in evaluations:
-            resume = Resume.query.get(evaluation.resume_id)
+        for job in jobs:
+            query = results_query(job.id, user_id)
+            if top_k is not None:
+                query = query.limit(top_k)
             results.append({
-                'resume_id': evaluation.resume_id,
-                'filename': resume.filename,
-                'fit_score': evaluation.fit_score,
-                'matching_keywords': evaluation.get_keywords(),
-                'evaluated_at': evaluation.evaluated_at.isoformat()
+                'job_id': job.id,
+                'job_title': job.title,
+                'results': [serialize_result(row) for row in query]
             })
         
-        results.sort(key=lambda x: x['fit_score'], reverse=True)
+        return jsonify({'jobs': results}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Internal Server Error', 'message': str(e)}), 500
+
+@bp.route('/resumes/<int:resume_id>/jobs', methods=['GET'])
+@jwt_required()
+def rank_jobs_for_resume(resume_id):
+    try:
+        user_id = get_jwt_identity()
+        
+        resume = Resume.query.filter_by(id=resume_id, user_id=user_id).first()
+        if not resume:
+            return jsonify({'error': 'Not Found', 'message': 'Resume not found'}), 404
+        
+        try:
+            top_k = parse_positive_int('top_k')
+        except ValueError:
+            return jsonify({'error': 'Bad Request', 'message': 'top_k must be a positive integer'}), 400
+        min_score = request.args.get('min_score', type=float)
+        
+        jobs = Job.query.filter_by(user_id=user_id).all()
+        
+        if not jobs:
+            return jsonify({'error': 'Bad Request', 'message': 'No jobs found to rank'}), 400
+        
+        # Store vectors missing from older resumes once, rather than
+        # recomputing them and their document frequencies on every request
+        fill_term_vectors(user_id)
+        db.session.commit()
+        
+        matrix = score_jobs_for_resumes(jobs, [resume], user_id)
+        ranked = sorted(
+            ((job, row[0]) for job, row in zip(jobs, matrix)),
+            key=lambda item: (-item[1][0], item[0].id)
+        )
+        if min_score is not None:
+            ranked = [(job, score) for job, score in ranked if score[0] >= min_score]
         
         return jsonify({
+            'resume_id': resume.id,
+            'filename': resume.filename,
+            'results': [{
+                'job_id': job.id,
+                'job_title': job.title,
+                'fit_score': fit_score,
+                'matching_keywords': matching_keywords
+            } for job, (fit_score, matching_keywords) in ranked[:top_k]]
+        }), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Internal Server Error', 'message': str(e)}), 500
+
+@bp.route('/stream', methods=['POST'])
+@jwt_required()
+def stream_evaluation():
+    try:
+        user_id = get_jwt_identity()
+        data = request.get_json()
+        
+        job_id = data.get('job_id')
+        if not job_id:
+            return jsonify({'error': 'Bad Request', 'message': 'job_id is required'}), 400
+        
+        job = Job.query.filter_by(id=job_id, user_id=user_id).first()
+        if not job:
+            return jsonify({'error': 'Not Found', 'message': 'Job not found'}), 404
+        
+        stream_format = data.get('format')
+        if stream_format is None:
+            stream_format = 'sse' if request.accept_mimetypes.best == STREAM_MIMETYPES['sse'] else 'ndjson'
+        if stream_format not in STREAM_MIMETYPES:
+            return jsonify({'error': 'Bad Request', 'message': 'format must be ndjson or sse'}), 400
+        
+        top_k = data.get('top_k', 10)
+        if not isinstance(top_k, int) or isinstance(top_k, bool) or top_k < 1:
+            return jsonify({'error': 'Bad Request', 'message': 'top_k must be a positive integer'}), 400
+        
+        # Only ids and hashes are needed up front; text is loaded per chunk while scoring
+        resumes = Resume.query.filter_by(user_id=user_id).options(load_only(Resume.id, Resume.text_hash)).all()
+        
+        if not resumes:
+            return jsonify({'error': 'Bad Request', 'message': 'No resumes found to evaluate'}), 400
+        
+        pending_ids = [resume.id for resume in prune_stale_evaluations(job, resumes, bool(data.get('rescore')))]
+        db.session.commit()
+        job_title = job.title
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Internal Server Error', 'message': str(e)}), 500
+    
+    def generate():
+        # Only the current top_k is kept, as a min-heap on (score, -resume_id)
+        ranked = []
+        total = 0
+        
+        def keep(result):
+            entry = (result['fit_score'], -result['resume_id'], result)
+            if len(ranked) < top_k:
+                heapq.heappush(ranked, entry)
+            elif entry[:2] > ranked[0][:2]:
+                heapq.heapreplace(ranked, entry)
+        
+        try:
+            # Results still valid from earlier runs go out first, straight from
+            # the index and in batches, so they are never all held at once
+            for row in results_query(job_id, user_id).execution_options(yield_per=RESULT_BATCH_SIZE):
+                result = serialize_result(row)
+                keep(result)
+                total += 1
+                yield format_message(stream_format, 'result', result)
+            
+            for resume, fit_score, matching_keywords, evaluated_at in stream_evaluations(job, pending_ids, current_app.config['EVALUATION_CHUNK_SIZE']):
+                result = {
+                    'resume_id': resume.id,
+                    'filename': resume.filename,
+                    'fit_score': fit_score,
+                    'matching_keywords': matching_keywords,
+                    'evaluated_at': evaluated_at.isoformat()
+                }
+                keep(result)
+                total += 1
+                yield format_message(stream_format, 'result', result)
+            
+            yield format_message(stream_format, 'done', {
+                'job_id': job_id,
+                'job_title': job_title,
+                'total': total,
+                'results': [entry[2] for entry in sorted(ranked, reverse=True)]
+            })
+        except Exception as e:
+            db.session.rollback()
+            yield format_message(stream_format, 'error', {'error': 'Internal Server Error', 'message': str(e)})
+    
+    response = Response(stream_with_context(generate()), mimetype=STREAM_MIMETYPES[stream_format])
+    response.headers['Cache-Control'] = 'no-cache'
+    # Stop reverse proxies from buffering the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@bp.route('/<int:job_id>', methods=['GET'])
+@jwt_required()
+@cached_response('jobs', 'evaluations')
+def get_evaluation_results(job_id):
+    try:
+        user_id = get_jwt_identity()
+        
+        job = Job.query.filter_by(id=job_id, user_id=user_id).first()
+        if not job:
+            return jsonify({'error': 'Not Found', 'message': 'Job not found'}), 404
+        
+        try:
+            limit = parse_positive_int('limit')
+            top_k = parse_positive_int('top_k')
+            min_score = request.args.get('min_score', type=float)
+            cursor = request.args.get('cursor')
+            last_score, last_id, served = decode_cursor(cursor) if cursor else (None, None, 0)
+        except (ValueError, KeyError, TypeError):
+            return jsonify({'error': 'Bad Request', 'message': 'Invalid limit, top_k or cursor'}), 400
+        
+        query = results_query(job_id, user_id)
+        if min_score is not None:
+            query = query.filter(Evaluation.fit_score >= min_score)
+        if cursor:
+            query = query.filter(or_(
+                Evaluation.fit_score < last_score,
+                and_(Evaluation.fit_score == last_score, Evaluation.id > last_id)
+            ))
+        
+        # top_k caps the ranking as a whole, limit sizes each page of it
+        page_size = limit
+        if top_k is not None:
+            remaining = max(top_k - served, 0)
+            page_size = remaining if page_size is None else min(page_size, remaining)
+        
+        rows = query.limit(page_size + 1).all() if page_size is not None else query.all()
+        has_more = page_size is not None and len(rows) > page_size
+        rows = rows[:page_size]
+        
+        if not rows and not cursor and min_score is None:
+            return jsonify({'error': 'Not Found', 'message': 'No evaluation results found for this job'}), 404
+        
+        response = {
             'job_id': job_id,
             'job_title': job.title,
-            'results': results
-        }), 200
+            'results': [serialize_result(row) for row in rows]
+        }
+        if limit is not None or top_k is not None:
+            has_more = has_more and (top_k is None or served + len(rows) < top_k)
+            response['next_cursor'] = encode_cursor(rows[-1], served + len(rows)) if has_more else None
+        
+        return jsonify(response), 200
+    except Exception as e:
+        return jsonify({'error': 'Internal Server Error', 'message': str(e)}), 500
+
+@bp.route('/<int:job_id>/export', methods=['GET'])
+@jwt_required()
+def export_evaluation_results(job_id):
+    try:
+        user_id = get_jwt_identity()
+        
+        job = Job.query.filter_by(id=job_id, user_id=user_id).first()
+        if not job:
+            return jsonify({'error': 'Not Found', 'message': 'Job not found'}), 404
+        
+        try:
+            top_k = parse_positive_int('top_k')
+            min_score = request.args.get('min_score', type=float)
+        except ValueError:
+            return jsonify({'error': 'Bad Request', 'message': 'top_k must be a positive integer'}), 400
+        
+        query = results_query(job_id, user_id)
+        if min_score is not None:
+            query = query.filter(Evaluation.fit_score >= min_score)
+        if top_k is not None:
+            query = query.limit(top_k)
+        filename = f"evaluation_{secure_filename(job.title) or job_id}_{datetime.utcnow().date().isoformat()}.csv"
+    except Exception as e:
+        return jsonify({'error': 'Internal Server Error', 'message': str(e)}), 500
+    
+    def generate():
+        # Rows are streamed from the database cursor in batches, so memory
+        # stays flat however many resumes were evaluated
+        writer = csv.writer(CSVLine())
+        yield writer.writerow(EXPORT_COLUMNS)
+        try:
+            for rank, row in enumerate(query.execution_options(yield_per=RESULT_BATCH_SIZE), 1):
+                yield writer.writerow([
+                    rank,
+                    row.resume_id,
+                    csv_cell(row.filename),
+                    row.fit_score,
+                    csv_cell('; '.join(json.loads(row.matching_keywords))),
+                    row.evaluated_at.isoformat()
+                ])
+        except Exception:
+            db.session.rollback()
+            raise
+    
+    response = Response(stream_with_context(generate()), mimetype='text/csv')
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@bp.route('/tasks/<task_id>', methods=['GET'])
+@jwt_required()
+def get_evaluation_task(task_id):
+    try:
+        user_id = get_jwt_identity()
+        
+        task = EvaluationTask.query.filter_by(id=task_id, user_id=user_id).first()
+        if not task:
+            return jsonify({'error': 'Not Found', 'message': 'Evaluation task not found'}), 404
+        
+        if task.expire_if_stale(current_app.config['EVALUATION_TASK_HEARTBEAT_TIMEOUT']):
+            db.session.commit()
+        
+        try:
+            top_k = parse_positive_int('top_k')
+            min_score = request.args.get('min_score', type=float)
+        except ValueError:
+            return jsonify({'error': 'Bad Request', 'message': 'top_k must be a positive integer'}), 400
+        
+        # Polls only need the current leaders, not every partial result
+        query = results_query(task.job_id, user_id)
+        if min_score is not None:
+            query = query.filter(Evaluation.fit_score >= min_score)
+        if top_k is not None:
+            query = query.limit(top_k)
+        
+        data = task.to_dict()
+        data['results'] = [serialize_result(row) for row in query]
+        
+        return jsonify(data), 200
     except Exception as e:
         return jsonify({'error': 'Internal Server Error', 'message': str(e)}), 500
@@ -1,7 +1,8 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
-from app.models import Job
+from app.models import Job, Evaluation
+from app.utils.http_cache import bump_versions, cached_response
 
 bp = Blueprint('jobs', __name__, url_prefix='/api/jobs')
 
@@ -24,6 +25,7 @@ def create_job():
             description=description
         )
         db.session.add(job)
+        bump_versions(user_id, 'jobs')
         db.session.commit()
         
         return jsonify(job.to_dict()), 201
@@ -33,6 +35,7 @@ def create_job():
 
 @bp.route('', methods=['GET'])
 @jwt_required()
+@cached_response('jobs')
 def get_jobs():
     try:
         user_id = get_jwt_identity()
@@ -58,8 +61,14 @@ def update_job(job_id):
         if not title or not description:
             return jsonify({'error': 'Bad Request', 'message': 'Title and description are required'}), 400
         
+        if description != job.description:
+            # Results scored against the old description are stale
+            Evaluation.query.filter_by(job_id=job.id).delete()
+        
         job.title = title
         job.description = description
+        # Results carry the job title, so they change along with the job
+        bump_versions(user_id, 'jobs', 'evaluations')
         db.session.commit()
         
         return jsonify(job.to_dict()), 200
@@ -78,6 +87,7 @@ def delete_job(job_id):
             return jsonify({'error': 'Not Found', 'message': 'Job not found'}), 404
         
         db.session.delete(job)
+        bump_versions(user_id, 'jobs', 'evaluations')
         db.session.commit()
         
         return jsonify({'message': 'Job deleted successfully'}), 200
@@ -0,0 +1,13 @@
+from flask import Blueprint, request, jsonify, current_app
+from app.instrumentation import metrics
+
+bp = Blueprint('metrics', __name__, url_prefix='/api/metrics')
+
+LOCAL_ADDRESSES = {'127.0.0.1', '::1'}
+
+@bp.route('', methods=['GET'])
+def get_metrics():
+    if not current_app.config['METRICS_ALLOW_REMOTE'] and request.remote_addr not in LOCAL_ADDRESSES:
+        return jsonify({'error': 'Forbidden', 'message': 'Metrics are only available locally'}), 403
+    
+    return jsonify(metrics.snapshot()), 200
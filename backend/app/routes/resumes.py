@@ -3,12 +3,34 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from werkzeug.utils import secure_filename
 from app import db
 from app.models import Resume
-from app.utils.file_handler import allowed_file, extract_text
+from app.utils.file_handler import allowed_file, extract_text, extraction_limits
+from app.utils.term_vectors import build_term_vector, assign_term_vector, release_term_vector
+from app.utils.hashing import text_hash
+from app.utils.search_index import index_resume, unindex_resume, search_supported, search_resumes
+from app.utils.bulk_import import import_resumes
+from app.utils.candidate_index import refresh_candidate_index
+from app.utils.http_cache import bump_versions, cached_response
+from app.utils.file_store import (
+    save_stream, content_path, acquire_stored_file, store_file, release_stored_file, remove_if_unreferenced
+)
+from sqlalchemy.orm import load_only
 import os
-from datetime import datetime
+import json
+import base64
 
 bp = Blueprint('resumes', __name__, url_prefix='/api/resumes')
 
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+
+def encode_search_cursor(score, resume_id):
+    payload = json.dumps({'score': score, 'id': resume_id})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+def decode_search_cursor(cursor):
+    payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    return float(payload['score']), int(payload['id'])
+
 @bp.route('/upload', methods=['POST'])
 @jwt_required()
 def upload_resume():
@@ -27,38 +49,87 @@ def upload_resume():
             return jsonify({'error': 'Bad Request', 'message': 'Invalid file type. Only PDF and TXT files are allowed'}), 400
         
         filename = secure_filename(file.filename)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        unique_filename = f"{timestamp}_{filename}"
-        file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], unique_filename)
-        
-        os.makedirs(current_app.config['UPLOAD_FOLDER'], exist_ok=True)
-        file.save(file_path)
-        
         file_extension = filename.rsplit('.', 1)[1].lower()
-        extracted_text = extract_text(file_path, file_extension)
+        upload_folder = current_app.config['UPLOAD_FOLDER']
+        os.makedirs(upload_folder, exist_ok=True)
         
-        if not extracted_text:
-            os.remove(file_path)
-            return jsonify({'error': 'Bad Request', 'message': 'Could not extract text from file'}), 400
+        saved = save_stream(file.stream, upload_folder, current_app.config['MAX_FILE_SIZE'], user_id)
+        if saved is None:
+            return jsonify({'error': 'Bad Request', 'message': 'File exceeds the maximum allowed size'}), 400
+        content_hash, temp_path = saved
+        
+        # Identical content is stored once; re-uploads reuse its cached extraction
+        stored = acquire_stored_file(content_hash)
+        if stored is None:
+            extracted_text = extract_text(temp_path, file_extension, **extraction_limits(current_app.config))
+            
+            if not extracted_text:
+                os.remove(temp_path)
+                return jsonify({'error': 'Bad Request', 'message': 'Could not extract text from file'}), 400
+            
+            file_path = content_path(upload_folder, content_hash, file_extension)
+            store_file(content_hash, temp_path, file_path, extracted_text, build_term_vector(extracted_text))
+            stored = acquire_stored_file(content_hash)
+        else:
+            os.remove(temp_path)
         
         resume = Resume(
             user_id=user_id,
             filename=filename,
-            file_path=file_path,
-            extracted_text=extracted_text
+            file_path=stored.file_path,
+            content_hash=content_hash,
+            extracted_text=stored.extracted_text,
+            text_hash=text_hash(stored.extracted_text)
         )
+        assign_term_vector(resume, stored.term_vector)
         db.session.add(resume)
+        db.session.flush()
+        index_resume(resume)
+        bump_versions(user_id, 'resumes')
         db.session.commit()
+        refresh_candidate_index(user_id)
         
         return jsonify(resume.to_dict(include_text=True)), 201
     except Exception as e:
         db.session.rollback()
-        if 'file_path' in locals() and os.path.exists(file_path):
-            os.remove(file_path)
+        if 'temp_path' in locals() and os.path.exists(temp_path):
+            os.remove(temp_path)
+        if 'file_path' in locals():
+            remove_if_unreferenced(content_hash, file_path)
+        return jsonify({'error': 'Internal Server Error', 'message': str(e)}), 500
+
+@bp.route('/bulk-upload', methods=['POST'])
+@jwt_required()
+def bulk_upload_resumes():
+    try:
+        user_id = get_jwt_identity()
+        
+        files = [file for file in request.files.getlist('files') if file.filename]
+        if not files:
+            return jsonify({'error': 'Bad Request', 'message': 'No files provided'}), 400
+        
+        report = import_resumes(files, user_id)
+        created = sum(1 for entry in report if entry['status'] == 'created')
+        if created:
+            bump_versions(user_id, 'resumes')
+            db.session.commit()
+            refresh_candidate_index(user_id)
+        
+        if not created:
+            return jsonify({'error': 'Bad Request', 'message': 'No resumes could be imported', 'results': report}), 400
+        
+        return jsonify({
+            'created': created,
+            'failed': len(report) - created,
+            'results': report
+        }), 201
+    except Exception as e:
+        db.session.rollback()
         return jsonify({'error': 'Internal Server Error', 'message': str(e)}), 500
 
 @bp.route('', methods=['GET'])
 @jwt_required()
+@cached_response('resumes')
 def get_resumes():
     try:
         user_id = get_jwt_identity()
@@ -67,6 +138,61 @@ def get_resumes():
     except Exception as e:
         return jsonify({'error': 'Internal Server Error', 'message': str(e)}), 500
 
+@bp.route('/search', methods=['GET'])
+@jwt_required()
+@cached_response('resumes')
+def find_resumes():
+    try:
+        user_id = get_jwt_identity()
+        
+        if not search_supported():
+            return jsonify({'error': 'Not Implemented', 'message': 'Full-text search requires SQLite with FTS5'}), 501
+        
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({'error': 'Bad Request', 'message': 'q is required'}), 400
+        
+        try:
+            limit = int(request.args.get('limit', SEARCH_DEFAULT_LIMIT))
+            if not 1 <= limit <= SEARCH_MAX_LIMIT:
+                raise ValueError
+            cursor = request.args.get('cursor')
+            after = decode_search_cursor(cursor) if cursor else None
+        except (ValueError, KeyError, TypeError):
+            return jsonify({'error': 'Bad Request', 'message': f'limit must be between 1 and {SEARCH_MAX_LIMIT} and cursor must come from a previous page'}), 400
+        
+        try:
+            rows = search_resumes(query, user_id, limit + 1, after)
+        except ValueError as e:
+            return jsonify({'error': 'Bad Request', 'message': str(e)}), 400
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
+        resumes = {
+            resume.id: resume for resume in Resume.query.filter(
+                Resume.id.in_([resume_id for resume_id, _, _ in rows]),
+                Resume.user_id == user_id
+            ).options(load_only(Resume.id, Resume.filename, Resume.uploaded_at))
+        }
+        results = [
+            {
+                'resume_id': resume_id,
+                'filename': resumes[resume_id].filename,
+                'uploaded_at': resumes[resume_id].uploaded_at.isoformat(),
+                'score': round(-score, 4),  # BM25, higher is more relevant
+                'snippet': snippet
+            }
+            for resume_id, score, snippet in rows if resume_id in resumes
+        ]
+        
+        return jsonify({
+            'query': query,
+            'results': results,
+            'next_cursor': encode_search_cursor(rows[-1][1], rows[-1][0]) if has_more else None
+        }), 200
+    except Exception as e:
+        return jsonify({'error': 'Internal Server Error', 'message': str(e)}), 500
+
 @bp.route('/<int:resume_id>', methods=['DELETE'])
 @jwt_required()
 def delete_resume(resume_id):
@@ -77,12 +203,27 @@ def delete_resume(resume_id):
         if not resume:
             return jsonify({'error': 'Not Found', 'message': 'Resume not found'}), 404
         
-        if os.path.exists(resume.file_path):
-            os.remove(resume.file_path)
-        
+        release_term_vector(resume)
+        unindex_resume(resume)
         db.session.delete(resume)
+        # Delete the row first so a shared file is released only once nothing references it
+        db.session.flush()
+        
+        content_hash, file_path = resume.content_hash, resume.file_path
+        released = release_stored_file(content_hash) if content_hash else False
+        
+        # Deleting a resume also drops its evaluations
+        bump_versions(user_id, 'resumes', 'evaluations')
         db.session.commit()
         
+        # Files go only once the delete is committed, so a failed one keeps them
+        if released:
+            remove_if_unreferenced(content_hash, file_path)
+        elif not content_hash and os.path.exists(file_path):
+            # Files stored before deduplication belong to this resume alone
+            os.remove(file_path)
+        refresh_candidate_index(user_id)
+        
         return jsonify({'message': 'Resume deleted successfully'}), 200
     except Exception as e:
         db.session.rollback()
@@ -0,0 +1,47 @@
+from sqlalchemy import String, inspect, text
+from app import db
+from app.models.types import CompressedText
+
+def upgrade_schema():
+    """
+    Add nullable columns and indexes declared on the models but missing from
+    existing tables. db.create_all only creates missing tables, so databases
+    created before a column or index was introduced need it added in place.
+    On PostgreSQL, text columns that became CompressedText are converted to
+    bytea, keeping their values as UTF-8 bytes that CompressedText still reads.
+    """
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    preparer = db.engine.dialect.identifier_preparer
+    
+    with db.engine.begin() as connection:
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            
+            existing_types = {column['name']: column['type'] for column in inspector.get_columns(table.name)}
+            existing_columns = set(existing_types)
+            for column in table.columns:
+                if column.name in existing_columns or not column.nullable:
+                    continue
+                
+                column_type = column.type.compile(dialect=db.engine.dialect)
+                connection.execute(text(
+                    f'ALTER TABLE {preparer.format_table(table)} '
+                    f'ADD COLUMN {preparer.format_column(column)} {column_type}'
+                ))
+            
+            # SQLite stores bytes in any column; PostgreSQL rejects them in text
+            if db.engine.dialect.name == 'postgresql':
+                for column in table.columns:
+                    if isinstance(column.type, CompressedText) and isinstance(existing_types.get(column.name), String):
+                        name = preparer.format_column(column)
+                        connection.execute(text(
+                            f'ALTER TABLE {preparer.format_table(table)} '
+                            f"ALTER COLUMN {name} TYPE bytea USING convert_to({name}, 'UTF8')"
+                        ))
+            
+            existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(bind=connection)
@@ -0,0 +1,242 @@
+import multiprocessing
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from flask import current_app
+from werkzeug.utils import secure_filename
+from app import db
+from app.database import IN_CHUNK_SIZE
+from app.models import Resume, StoredFile
+from app.utils.file_handler import allowed_file, extract_text, extraction_limits
+from app.utils.executors import LazyExecutor
+from app.utils.file_store import (
+    save_stream, content_path, acquire_stored_file, store_file, remove_if_unreferenced
+)
+from app.utils.hashing import text_hash
+from app.utils.search_index import index_resume
+from app.utils.nlp_engine import count_terms
+from app.utils.skill_matcher import load_skill_matcher
+from app.utils.term_vectors import encode_token_counts, assign_term_vector
+
+EXTRACTION_CRASHED = 'Text extraction stopped unexpectedly, e.g. out of memory; upload the file again'
+
+def extraction_workers(config):
+    """
+    Extraction processes for this server process: BULK_IMPORT_WORKERS, or an
+    even share of BULK_IMPORT_HOST_WORKERS between the WEB_CONCURRENCY
+    server processes, so the host is not oversubscribed
+    """
+    if config['BULK_IMPORT_WORKERS']:
+        return config['BULK_IMPORT_WORKERS']
+    server_processes = int(os.environ.get('WEB_CONCURRENCY', 1))
+    return max(1, config['BULK_IMPORT_HOST_WORKERS'] // server_processes)
+
+# Spawned workers only import the extraction code, so they are safe to
+# start from a threaded server process
+_executor = LazyExecutor(lambda config: ProcessPoolExecutor(
+    max_workers=extraction_workers(config),
+    mp_context=multiprocessing.get_context('spawn')
+))
+
+def extract_and_count(file_path, file_extension, limits, skills_file):
+    """Extract a file's text and count its terms; runs in a worker process"""
+    text = extract_text(file_path, file_extension, **limits)
+    return text, count_terms(text, load_skill_matcher(skills_file)) if text else None
+
+def _stage_files(files, user_id, config, report, staged):
+    """
+    Save uploaded files and ZIP members to disk, appending the ones to
+    extract to staged as they are written, so the caller can clean up
+    after a failure part way through
+    """
+    def stage(label, filename, source):
+        if len(staged) >= config['BULK_UPLOAD_MAX_FILES']:
+            report.append({'filename': label, 'status': 'failed', 'error': 'Too many files in one upload'})
+            return
+        if not allowed_file(filename, config['ALLOWED_EXTENSIONS']):
+            report.append({'filename': label, 'status': 'failed', 'error': 'Invalid file type. Only PDF and TXT files are allowed'})
+            return
+        
+        saved = save_stream(source, config['UPLOAD_FOLDER'], config['MAX_FILE_SIZE'], user_id)
+        if saved is None:
+            report.append({'filename': label, 'status': 'failed', 'error': 'File exceeds the maximum allowed size'})
+            return
+        
+        staged.append({
+            'label': label,
+            'filename': filename,
+            'extension': filename.rsplit('.', 1)[1].lower(),
+            'content_hash': saved[0],
+            'temp_path': saved[1],
+            'file_path': None
+        })
+    
+    for file in files:
+        filename = secure_filename(file.filename or '')
+        if not filename:
+            continue
+        
+        if not filename.lower().endswith('.zip'):
+            stage(filename, filename, file.stream)
+            continue
+        
+        try:
+            with zipfile.ZipFile(file.stream) as archive:
+                for info in archive.infolist():
+                    member_name = secure_filename(os.path.basename(info.filename))
+                    if info.is_dir() or info.filename.startswith('__MACOSX/') or not member_name:
+                        continue
+                    
+                    label = f"{filename}/{info.filename}"
+                    if info.file_size > config['MAX_FILE_SIZE']:
+                        report.append({'filename': label, 'status': 'failed', 'error': 'File exceeds the maximum allowed size'})
+                        continue
+                    
+                    with archive.open(info) as source:
+                        stage(label, member_name, source)
+        except zipfile.BadZipFile:
+            report.append({'filename': filename, 'status': 'failed', 'error': 'Invalid ZIP archive'})
+
+def _discard(item, report, error):
+    if os.path.exists(item['temp_path']):
+        os.remove(item['temp_path'])
+    report.append({'filename': item['label'], 'status': 'failed', 'error': error})
+
+def _commit_batch(batch, report):
+    if not batch:
+        return
+    
+    try:
+        # Flush first so ids and defaults are populated without reloading rows after commit
+        db.session.flush()
+        for _, resume in batch:
+            index_resume(resume)
+        created = [{'filename': item['label'], 'status': 'created', 'resume': resume.to_dict()} for item, resume in batch]
+        db.session.commit()
+        report.extend(created)
+    except Exception as e:
+        db.session.rollback()
+        for item, _ in batch:
+            _discard(item, report, str(e))
+            if item['file_path']:
+                remove_if_unreferenced(item['content_hash'], item['file_path'])
+    
+    batch.clear()
+
+def _add_resumes(items, user_id, batch, report, batch_size):
+    """Create one resume per item from their shared stored file, committing full batches"""
+    for item in items:
+        if os.path.exists(item['temp_path']):
+            os.remove(item['temp_path'])
+        
+        stored = acquire_stored_file(item['content_hash'])
+        if stored is None:
+            report.append({'filename': item['label'], 'status': 'failed', 'error': 'Stored file is no longer available'})
+            continue
+        
+        item['file_path'] = stored.file_path
+        resume = Resume(
+            user_id=user_id,
+            filename=item['filename'],
+            file_path=stored.file_path,
+            content_hash=stored.sha256,
+            extracted_text=stored.extracted_text,
+            text_hash=text_hash(stored.extracted_text)
+        )
+        assign_term_vector(resume, stored.term_vector)
+        db.session.add(resume)
+        batch.append((item, resume))
+        
+        if len(batch) >= batch_size:
+            _commit_batch(batch, report)
+
+def _submit_extractions(config, groups):
+    """
+    Queue one extraction per content hash on the shared pool. A pool broken
+    by a crashed worker, e.g. in an earlier request, is replaced once.
+    Returns (executor, {future: content_hash}).
+    """
+    limits = extraction_limits(config)
+    for attempt in range(2):
+        executor = _executor.get(config)
+        try:
+            return executor, {
+                executor.submit(extract_and_count, items[0]['temp_path'], items[0]['extension'], limits, config['SKILLS_FILE']): content_hash
+                for content_hash, items in groups.items()
+            }
+        except BrokenProcessPool:
+            _executor.reset(executor)
+            if attempt:
+                raise
+
+def import_resumes(files, user_id):
+    """
+    Import many resumes at once from uploaded files and ZIP archives.
+    Identical content is extracted once, whether repeated within the upload
+    or already stored; new content is extracted across a process pool.
+    Rows are committed in batches. Returns a per-file report of created
+    resumes and failures. Staged temporary files are removed however the
+    import ends.
+    """
+    config = current_app.config
+    upload_folder = config['UPLOAD_FOLDER']
+    batch_size = config['BULK_IMPORT_BATCH_SIZE']
+    os.makedirs(upload_folder, exist_ok=True)
+    
+    report = []
+    staged = []
+    try:
+        _stage_files(files, user_id, config, report, staged)
+        
+        groups = {}
+        for item in staged:
+            groups.setdefault(item['content_hash'], []).append(item)
+        
+        hashes = list(groups)
+        stored_hashes = set()
+        for start in range(0, len(hashes), IN_CHUNK_SIZE):
+            chunk = hashes[start:start + IN_CHUNK_SIZE]
+            stored_hashes.update(sha256 for (sha256,) in db.session.query(StoredFile.sha256).filter(StoredFile.sha256.in_(chunk)))
+        
+        executor, futures = _submit_extractions(config, {
+            content_hash: items for content_hash, items in groups.items() if content_hash not in stored_hashes
+        })
+        
+        batch = []
+        for content_hash in stored_hashes:
+            _add_resumes(groups[content_hash], user_id, batch, report, batch_size)
+        
+        for future in as_completed(futures):
+            content_hash = futures[future]
+            items = groups[content_hash]
+            try:
+                extracted_text, token_counts = future.result()
+            except BrokenProcessPool:
+                # Every extraction still queued fails with it; the next
+                # upload gets a fresh pool
+                _executor.reset(executor)
+                for item in items:
+                    _discard(item, report, EXTRACTION_CRASHED)
+                continue
+            except Exception as e:
+                for item in items:
+                    _discard(item, report, str(e))
+                continue
+            
+            if not extracted_text:
+                for item in items:
+                    _discard(item, report, 'Could not extract text from file')
+                continue
+            
+            first = items[0]
+            file_path = content_path(upload_folder, content_hash, first['extension'])
+            store_file(content_hash, first['temp_path'], file_path, extracted_text, encode_token_counts(token_counts))
+            _add_resumes(items, user_id, batch, report, batch_size)
+        
+        _commit_batch(batch, report)
+        return report
+    finally:
+        for item in staged:
+            if os.path.exists(item['temp_path']):
+                os.remove(item['temp_path'])
@@ -0,0 +1,277 @@
+import heapq
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import uuid
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from sqlalchemy import func
+from app import db
+from app.models import Resume
+from app.instrumentation import timed
+from app.utils.executors import LazyExecutor
+from app.utils.nlp_engine import count_terms, decode_term_vector
+from app.utils.term_vectors import lookup_terms, load_idf
+from app.utils.skill_matcher import current_skill_matcher
+
+# Rows fetched per round trip while building an index
+BUILD_BATCH_SIZE = 1000
+
+# File layout: magic, header length, JSON header padded to 4 bytes, then the
+# uint32 arrays terms, indptr, indices and unindexed back to back
+INDEX_MAGIC = b'RSIDX001'
+HEADER_LENGTH = struct.Struct('<I')
+
+class CandidateIndex:
+    """
+    Inverted index from term id to the ids of the resumes containing it,
+    used to shortlist the resumes worth scoring exactly against a job.
+    Stored in CSR form: the postings of terms[i] are
+    indices[indptr[i]:indptr[i + 1]]. The arrays are either in memory or
+    read-only views of a memory-mapped index file shared between processes.
+    """
+    
+    def __init__(self, terms, indptr, indices, unindexed, signature=None, last_id=0, mapping=None):
+        self.terms = terms
+        self.indptr = indptr
+        self.indices = indices
+        self.unindexed = unindexed  # resumes without a term vector; always shortlisted
+        self.signature = signature
+        self.last_id = last_id  # highest resume id covered; later uploads are not indexed yet
+        self.mapping = mapping
+    
+    @classmethod
+    def from_vectors(cls, vectors, signature=None):
+        """Build an in-memory index from (resume_id, {term_id: count} or None) pairs"""
+        postings = {}
+        unindexed = array('I')
+        last_id = 0
+        for resume_id, vector in vectors:
+            last_id = max(last_id, resume_id)
+            if vector is None:
+                unindexed.append(resume_id)
+                continue
+            for term_id in vector:
+                ids = postings.get(term_id)
+                if ids is None:
+                    ids = postings[term_id] = array('I')
+                ids.append(resume_id)
+        
+        terms = array('I', sorted(postings))
+        indptr = array('I', [0])
+        indices = array('I')
+        for term_id in terms:
+            indices.extend(postings[term_id])
+            indptr.append(len(indices))
+        return cls(terms, indptr, indices, unindexed, signature, last_id)
+    
+    @classmethod
+    def load(cls, path):
+        """Map an index file read-only; its pages are shared by every process mapping it"""
+        with open(path, 'rb') as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        view = memoryview(mapping)
+        if bytes(view[:len(INDEX_MAGIC)]) != INDEX_MAGIC:
+            raise ValueError(f'{path} is not a candidate index')
+        offset = len(INDEX_MAGIC)
+        (header_length,) = HEADER_LENGTH.unpack_from(view, offset)
+        offset += HEADER_LENGTH.size
+        header = json.loads(bytes(view[offset:offset + header_length]))
+        offset += header_length
+        
+        arrays = []
+        for length in (header['terms'], header['terms'] + 1, header['postings'], header['unindexed']):
+            arrays.append(view[offset:offset + length * 4].cast('I'))
+            offset += length * 4
+        return cls(*arrays, signature=header['signature'], last_id=header['last_id'], mapping=mapping)
+    
+    def save(self, path):
+        """Write the index next to path and atomically swap it into place"""
+        header = json.dumps({
+            'signature': self.signature,
+            'last_id': self.last_id,
+            'terms': len(self.terms),
+            'postings': len(self.indices),
+            'unindexed': len(self.unindexed)
+        }).encode()
+        header += b' ' * (-len(header) % 4)
+        
+        temp_path = os.path.join(os.path.dirname(path), f'.index-{uuid.uuid4().hex}')
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(INDEX_MAGIC)
+                f.write(HEADER_LENGTH.pack(len(header)))
+                f.write(header)
+                for values in (self.terms, self.indptr, self.indices, self.unindexed):
+                    f.write(array('I', values).tobytes())
+            # Processes still mapping the old file keep reading it until they reload
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+    
+    def postings(self, term_id):
+        position = bisect_left(self.terms, term_id)
+        if position == len(self.terms) or self.terms[position] != term_id:
+            return None
+        return self.indices[self.indptr[position]:self.indptr[position + 1]]
+    
+    def shortlist(self, job_weights, limit, max_terms):
+        """
+        Return up to limit resume ids sharing the most job weight with the job.
+        Only the max_terms heaviest job terms are looked up: the light ones are
+        common terms whose long posting lists barely change the ranking.
+        """
+        postings = {}
+        for term_id in job_weights:
+            resume_ids = self.postings(term_id)
+            if resume_ids is not None:
+                postings[term_id] = resume_ids
+        
+        overlap = Counter()
+        for term_id in heapq.nlargest(max_terms, postings, key=job_weights.get):
+            weight = job_weights[term_id]
+            for resume_id in postings[term_id]:
+                overlap[resume_id] += weight
+        
+        shortlist = [resume_id for resume_id, _ in overlap.most_common(limit)]
+        return shortlist + list(self.unindexed)
+
+def corpus_signature(user_id):
+    """
+    Cheap fingerprint of a user's resume corpus. Resumes are never edited in
+    place, so any upload, deletion or vector backfill changes one of these.
+    The byte order is included since index files hold native integers.
+    """
+    count, id_sum, last_upload, vector_count = db.session.query(
+        func.count(Resume.id),
+        func.sum(Resume.id),
+        func.max(Resume.uploaded_at),
+        func.count(Resume.term_vector)
+    ).filter(Resume.user_id == user_id).one()
+    return [count, id_sum, last_upload.isoformat() if last_upload else None, vector_count, sys.byteorder]
+
+def build_candidate_index(user_id, signature=None):
+    rows = db.session.query(Resume.id, Resume.term_vector).filter(
+        Resume.user_id == user_id
+    ).execution_options(yield_per=BUILD_BATCH_SIZE)
+    return CandidateIndex.from_vectors(
+        ((resume_id, decode_term_vector(term_vector) if term_vector is not None else None) for resume_id, term_vector in rows),
+        signature
+    )
+
+def index_path(index_dir, user_id):
+    return os.path.join(index_dir, f'user-{user_id}.idx')
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+_rebuild_executor = LazyExecutor(lambda config: ThreadPoolExecutor(max_workers=1, thread_name_prefix='candidate-index'))
+_queued_rebuilds = set()
+
+def _load_index(path):
+    if not os.path.exists(path):
+        return None
+    try:
+        return CandidateIndex.load(path)
+    except (ValueError, KeyError, OSError):
+        return None
+
+def rebuild_candidate_index(user_id, index_dir):
+    """
+    Write the user's index for their current corpus unless the file on disk
+    already covers it, and swap it in for this process
+    """
+    signature = corpus_signature(user_id)
+    path = index_path(index_dir, user_id)
+    index = _load_index(path)
+    if index is None or index.signature != signature:
+        os.makedirs(index_dir, exist_ok=True)
+        build_candidate_index(user_id, signature).save(path)
+        index = CandidateIndex.load(path)
+    
+    with _indexes_lock:
+        _indexes[user_id] = index
+    return index
+
+def _run_rebuild(app, user_id):
+    with app.app_context():
+        # Dequeue first, so changes made while this build runs queue another
+        with _indexes_lock:
+            _queued_rebuilds.discard(user_id)
+        try:
+            rebuild_candidate_index(user_id, app.config['INDEX_DIR'])
+        except Exception:
+            app.logger.exception('Rebuilding the candidate index of user %s failed', user_id)
+        finally:
+            db.session.remove()
+
+def schedule_index_rebuild(app, user_id):
+    """Rebuild a user's index on a background thread unless one is already queued"""
+    with _indexes_lock:
+        if user_id in _queued_rebuilds:
+            return
+        _queued_rebuilds.add(user_id)
+    _rebuild_executor.get(app.config).submit(_run_rebuild, app, user_id)
+
+def refresh_candidate_index(user_id):
+    """
+    Queue a rebuild after a user's resumes changed, for users that have an
+    index; call it once the change is committed
+    """
+    if os.path.exists(index_path(current_app.config['INDEX_DIR'], user_id)):
+        schedule_index_rebuild(current_app._get_current_object(), user_id)
+
+def get_candidate_index(user_id, index_dir):
+    """
+    Return the user's index. A process maps the on-disk index once and picks
+    up newer files as they are written. A stale index keeps being served
+    while a rebuild runs in the background; only a user without any index
+    waits for the first build.
+    """
+    signature = corpus_signature(user_id)
+    with _indexes_lock:
+        index = _indexes.get(user_id)
+    if index is not None and index.signature == signature:
+        return index
+    
+    # Another process may already have written a newer file
+    on_disk = _load_index(index_path(index_dir, user_id))
+    if on_disk is not None and (index is None or on_disk.signature != index.signature):
+        index = on_disk
+        with _indexes_lock:
+            _indexes[user_id] = index
+    
+    if index is None:
+        return rebuild_candidate_index(user_id, index_dir)
+    if index.signature != signature:
+        schedule_index_rebuild(current_app._get_current_object(), user_id)
+    return index
+
+@timed('prefilter')
+def shortlist_resume_ids(job_text, user_id, limit, max_terms, index_dir):
+    """
+    Pick at most limit resumes (plus any without a stored term vector or not
+    indexed yet) worth scoring exactly against a job, ranked by the
+    IDF-weighted job terms they contain. Larger limits trade latency for
+    recall.
+    """
+    idf, default_idf = load_idf(user_id)
+    job_counts = count_terms(job_text, current_skill_matcher())
+    term_ids = lookup_terms(job_counts)
+    job_weights = {term_ids[token]: count * idf.get(term_ids[token], default_idf) for token, count in job_counts.items() if token in term_ids}
+    index = get_candidate_index(user_id, index_dir)
+    shortlist = set(index.shortlist(job_weights, limit, max_terms))
+    # Resumes uploaded since the index was built are always scored, like
+    # the unindexed ones, until a rebuild covers them
+    shortlist.update(resume_id for (resume_id,) in db.session.query(Resume.id).filter(
+        Resume.user_id == user_id,
+        Resume.id > index.last_id
+    ))
+    return shortlist
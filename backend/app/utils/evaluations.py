@@ -0,0 +1,195 @@
+import importlib
+import json
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import func, insert, select
+from app import db
+from app.database import IN_CHUNK_SIZE
+from app.instrumentation import stage
+from app.models import Evaluation, Resume
+from app.utils.hashing import text_hash
+from app.utils.http_cache import bump_versions
+from app.utils.nlp_engine import decode_term_vector
+from app.utils.term_vectors import UPSERT_DIALECTS, score_jobs_for_resumes, job_scorer, fill_term_vectors, get_term_vector, corpus_size
+
+# Pending sets up to this size are read by id; larger ones scan the user's pool
+SELECTIVE_LOAD_LIMIT = 2000
+
+def prune_stale_evaluations(job, resumes, rescore=False):
+    """
+    Delete this job's evaluations that no longer match the current content
+    and return the resumes that still need scoring. resumes is the user's
+    whole pool.
+    An evaluation stays valid while the job description and the resume text
+    hash to what was scored and the pool size, which drives the IDF that
+    weighted the score, is within IDF_DRIFT_TOLERANCE of the size it was
+    scored at. Small uploads and deletions therefore only score the new
+    resumes, while drift beyond the tolerance rescores the job. Evaluations
+    for resumes that left the pool are removed as well, as are extra
+    evaluations of the same resume left by overlapping runs. rescore=True
+    treats every evaluation as stale.
+    """
+    job_hash = text_hash(job.description)
+    pool_size = len(resumes)
+    max_drift = current_app.config['IDF_DRIFT_TOLERANCE']
+    resume_hashes = {}
+    for resume in resumes:
+        if resume.text_hash is None:
+            resume.text_hash = text_hash(resume.extracted_text)
+        resume_hashes[resume.id] = resume.text_hash
+    
+    fresh_ids = set()
+    stale_ids = []
+    rows = db.session.query(
+        Evaluation.id, Evaluation.resume_id, Evaluation.job_hash, Evaluation.resume_hash, Evaluation.corpus_size
+    ).filter(Evaluation.job_id == job.id)
+    for evaluation_id, resume_id, scored_job_hash, scored_resume_hash, scored_pool_size in rows:
+        if (
+            not rescore and resume_id not in fresh_ids
+            and scored_pool_size is not None and abs(pool_size - scored_pool_size) <= max_drift * scored_pool_size
+            and scored_job_hash == job_hash and scored_resume_hash == resume_hashes.get(resume_id)
+        ):
+            fresh_ids.add(resume_id)
+        else:
+            stale_ids.append(evaluation_id)
+    
+    for start in range(0, len(stale_ids), IN_CHUNK_SIZE):
+        chunk = stale_ids[start:start + IN_CHUNK_SIZE]
+        Evaluation.query.filter(Evaluation.id.in_(chunk)).delete(synchronize_session=False)
+    if stale_ids:
+        bump_versions(job.user_id, 'evaluations')
+    
+    return [resume for resume in resumes if resume.id not in fresh_ids]
+
+def remove_duplicate_evaluations():
+    """
+    Keep only the latest evaluation of each job and resume, as databases
+    created before ix_evaluations_job_id_resume_id was unique may hold more
+    """
+    latest = select(func.max(Evaluation.id)).group_by(Evaluation.job_id, Evaluation.resume_id)
+    removed = Evaluation.query.filter(Evaluation.id.notin_(latest)).delete(synchronize_session=False)
+    db.session.commit()
+    return removed
+
+def insert_evaluations(rows):
+    """
+    Bulk insert evaluation rows, skipping any (job, resume) pair an
+    overlapping evaluate call stored first
+    """
+    dialect_module = UPSERT_DIALECTS.get(db.session.get_bind().dialect.name)
+    if dialect_module is None:
+        db.session.execute(insert(Evaluation), rows)
+        return
+    statement = importlib.import_module(dialect_module).insert(Evaluation)
+    db.session.execute(statement.on_conflict_do_nothing(index_elements=['job_id', 'resume_id']), rows)
+
+def _evaluation_row(job, job_hash, pool_size, resume, fit_score, matching_keywords):
+    return {
+        'job_id': job.id,
+        'resume_id': resume.id,
+        'fit_score': fit_score,
+        'matching_keywords': json.dumps(matching_keywords),
+        'job_hash': job_hash,
+        'resume_hash': resume.text_hash,
+        'corpus_size': pool_size
+    }
+
+def evaluation_scorer(job):
+    """
+    Weight a job against its user's corpus as job_scorer does, first filling
+    in missing term vectors so the IDF and vocabulary cover them. Returns
+    (score, pool_size) with the corpus size the weights reflect.
+    """
+    fill_term_vectors(job.user_id)
+    return job_scorer(job.description, job.user_id), corpus_size(job.user_id)
+
+def _pending_vector_rows(user_id, resume_ids, chunk_size):
+    """Yield lists of (id, text_hash, term_vector) rows for the given resumes"""
+    columns = select(Resume.id, Resume.text_hash, Resume.term_vector)
+    if len(resume_ids) <= SELECTIVE_LOAD_LIMIT:
+        for start in range(0, len(resume_ids), IN_CHUNK_SIZE):
+            yield db.session.execute(columns.where(Resume.id.in_(resume_ids[start:start + IN_CHUNK_SIZE]))).all()
+        return
+    
+    # Most of the pool is pending: one streamed scan beats thousands of IN lists
+    pending = set(resume_ids)
+    result = db.session.execute(columns.where(Resume.user_id == user_id).execution_options(yield_per=chunk_size))
+    for partition in result.partitions():
+        yield [row for row in partition if row.id in pending]
+
+def add_evaluations(job, resume_ids, chunk_size, scorer=None):
+    """
+    Score a job's pending resumes and bulk insert their evaluations a chunk at
+    a time. Only ids, hashes and term vectors are read, as plain rows rather
+    than ORM objects, so memory stays bounded by one chunk of vectors.
+    Callers adding several batches for one job pass the evaluation_scorer
+    they built once.
+    """
+    if not resume_ids:
+        return
+    
+    bump_versions(job.user_id, 'evaluations')
+    job_hash = text_hash(job.description)
+    score, pool_size = scorer or evaluation_scorer(job)
+    for rows in _pending_vector_rows(job.user_id, resume_ids, chunk_size):
+        if not rows:
+            continue
+        
+        with stage('score'):
+            scores = score([decode_term_vector(row.term_vector) for row in rows])
+        insert_evaluations([
+            _evaluation_row(job, job_hash, pool_size, row, fit_score, matching_keywords)
+            for row, (fit_score, matching_keywords) in zip(rows, scores)
+        ])
+
+def add_job_evaluations(jobs, pending):
+    """
+    Score several jobs at once with one jobs x resumes matrix product and bulk
+    insert the evaluations. pending holds, per job, the resumes returned by
+    prune_stale_evaluations; all jobs must belong to the same user.
+    """
+    resumes = list({resume.id: resume for job_pending in pending for resume in job_pending}.values())
+    if not resumes:
+        return
+    
+    user_id = jobs[0].user_id
+    bump_versions(user_id, 'evaluations')
+    fill_term_vectors(user_id)
+    pool_size = corpus_size(user_id)
+    columns = {resume.id: index for index, resume in enumerate(resumes)}
+    matrix = score_jobs_for_resumes(jobs, resumes, user_id)
+    
+    rows = []
+    for job, job_pending, scores in zip(jobs, pending, matrix):
+        job_hash = text_hash(job.description)
+        for resume in job_pending:
+            fit_score, matching_keywords = scores[columns[resume.id]]
+            rows.append(_evaluation_row(job, job_hash, pool_size, resume, fit_score, matching_keywords))
+    insert_evaluations(rows)
+
+def stream_evaluations(job, resume_ids, chunk_size):
+    """
+    Score resumes one at a time, yielding (resume, fit_score, matching_keywords,
+    evaluated_at) as soon as each is computed. Evaluations are inserted and
+    committed every chunk_size resumes, and resumes are loaded per chunk so
+    only one chunk is held in memory.
+    """
+    job_hash = text_hash(job.description)
+    score, pool_size = evaluation_scorer(job)
+    
+    for start in range(0, len(resume_ids), chunk_size):
+        # Reload per chunk: committing expires the previously loaded rows
+        chunk = Resume.query.filter(Resume.id.in_(resume_ids[start:start + chunk_size])).all()
+        rows = []
+        for resume in chunk:
+            with stage('score'):
+                fit_score, matching_keywords = score([get_term_vector(resume)])[0]
+            row = _evaluation_row(job, job_hash, pool_size, resume, fit_score, matching_keywords)
+            row['evaluated_at'] = datetime.utcnow()
+            rows.append(row)
+            yield resume, fit_score, matching_keywords, row['evaluated_at']
+        
+        if rows:
+            insert_evaluations(rows)
+            bump_versions(job.user_id, 'evaluations')
+        db.session.commit()
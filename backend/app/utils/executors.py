@@ -0,0 +1,27 @@
+import threading
+
+class LazyExecutor:
+    """
+    Process-wide executor created on first use, so every server worker
+    starts its own after forking. reset() discards a broken executor and
+    the next get() creates a fresh one.
+    """
+    
+    def __init__(self, factory):
+        self.factory = factory
+        self.lock = threading.Lock()
+        self.executor = None
+    
+    def get(self, config):
+        """Return the executor, creating it from config on first use"""
+        with self.lock:
+            if self.executor is None:
+                self.executor = self.factory(config)
+            return self.executor
+    
+    def reset(self, executor):
+        """Discard executor unless it was already replaced"""
+        with self.lock:
+            if self.executor is executor:
+                self.executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
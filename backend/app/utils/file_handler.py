@@ -1,31 +1,67 @@
 import os
+import time
 from werkzeug.utils import secure_filename
-from PyPDF2 import PdfReader
+from app.instrumentation import timed
 
 def allowed_file(filename, allowed_extensions):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in allowed_extensions
 
-def extract_text_from_pdf(file_path):
+def extraction_limits(config):
+    """Read the text extraction caps from an app config mapping"""
+    return {
+        'max_pages': config['PDF_MAX_PAGES'],
+        'max_chars': config['MAX_EXTRACTED_CHARS'],
+        'time_budget': config['PDF_TIME_BUDGET']
+    }
+
+def iter_pdf_pages(file_path, max_pages=None, max_chars=None, time_budget=None):
+    """
+    Yield the text of a PDF page by page.
+    Stops early once max_pages pages or max_chars characters have been
+    produced, or after time_budget seconds, so one pathological file cannot
+    stall a worker. A page that yields no text counts as an empty page.
+    """
+    # PyPDF2 is heavy to import and only needed once a PDF arrives
+    from PyPDF2 import PdfReader
+    
+    reader = PdfReader(file_path)
+    started = time.monotonic()
+    remaining_chars = max_chars
+    
+    for page_number, page in enumerate(reader.pages):
+        if max_pages is not None and page_number >= max_pages:
+            break
+        if time_budget is not None and time.monotonic() - started > time_budget:
+            break
+        
+        text = page.extract_text() or ''
+        if remaining_chars is not None:
+            text = text[:remaining_chars]
+            remaining_chars -= len(text)
+        
+        yield text
+        
+        if remaining_chars == 0:
+            break
+
+def extract_text_from_pdf(file_path, max_pages=None, max_chars=None, time_budget=None):
     try:
-        reader = PdfReader(file_path)
-        text = ''
-        for page in reader.pages:
-            text += page.extract_text() + '\n'
-        return text.strip()
+        return '\n'.join(iter_pdf_pages(file_path, max_pages, max_chars, time_budget)).strip()
     except Exception as e:
         raise Exception(f'Failed to extract text from PDF: {str(e)}')
 
-def extract_text_from_txt(file_path):
+def extract_text_from_txt(file_path, max_chars=None):
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
-            return f.read().strip()
+            return f.read(max_chars if max_chars is not None else -1).strip()
     except Exception as e:
         raise Exception(f'Failed to read text file: {str(e)}')
 
-def extract_text(file_path, file_extension):
+@timed('extract')
+def extract_text(file_path, file_extension, max_pages=None, max_chars=None, time_budget=None):
     if file_extension == 'pdf':
-        return extract_text_from_pdf(file_path)
+        return extract_text_from_pdf(file_path, max_pages, max_chars, time_budget)
     elif file_extension == 'txt':
-        return extract_text_from_txt(file_path)
+        return extract_text_from_txt(file_path, max_chars)
     else:
         raise Exception(f'Unsupported file type: {file_extension}')
@@ -0,0 +1,78 @@
+import hashlib
+import os
+import uuid
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models import StoredFile
+
+COPY_CHUNK_SIZE = 64 * 1024
+
+def save_stream(source, upload_folder, max_size, owner_id):
+    """
+    Stream an upload to a temporary file while hashing it.
+    Returns (sha256, temp_path), or None when it exceeds max_size bytes.
+    The hash covers the owner as well as the content, so identical files are
+    only shared between one user's resumes and timing or storage never
+    reveals whether another user uploaded the same file.
+    """
+    temp_path = os.path.join(upload_folder, f'.upload-{uuid.uuid4().hex}')
+    digest = hashlib.sha256(f'{owner_id}:'.encode())
+    written = 0
+    with open(temp_path, 'wb') as target:
+        while written <= max_size:
+            chunk = source.read(COPY_CHUNK_SIZE)
+            if not chunk:
+                break
+            written += len(chunk)
+            digest.update(chunk)
+            target.write(chunk)
+    
+    if written > max_size:
+        os.remove(temp_path)
+        return None
+    return digest.hexdigest(), temp_path
+
+def content_path(upload_folder, sha256, extension):
+    return os.path.join(upload_folder, f'{sha256}.{extension}')
+
+def acquire_stored_file(sha256):
+    """Take a reference on stored content, returning it, or None if it is not stored"""
+    updated = StoredFile.query.filter_by(sha256=sha256).update({'ref_count': StoredFile.ref_count + 1})
+    return db.session.get(StoredFile, sha256) if updated else None
+
+def store_file(sha256, temp_path, file_path, extracted_text, term_vector):
+    """
+    Move a new upload into the content store and cache its extraction.
+    The entry starts without references; follow up with acquire_stored_file.
+    """
+    os.replace(temp_path, file_path)
+    try:
+        with db.session.begin_nested():
+            db.session.add(StoredFile(
+                sha256=sha256,
+                file_path=file_path,
+                size=os.path.getsize(file_path),
+                extracted_text=extracted_text,
+                term_vector=term_vector
+            ))
+    except IntegrityError:
+        # A concurrent upload stored the same content first
+        pass
+
+def release_stored_file(sha256):
+    """
+    Drop one reference, deleting the entry once no resume points to it.
+    Returns True when the entry went; the caller then removes the file with
+    remove_if_unreferenced after committing, so a rollback keeps it.
+    """
+    StoredFile.query.filter_by(sha256=sha256).update({'ref_count': StoredFile.ref_count - 1})
+    stored = db.session.get(StoredFile, sha256)
+    if stored is None or stored.ref_count > 0:
+        return False
+    db.session.delete(stored)
+    return True
+
+def remove_if_unreferenced(sha256, file_path):
+    """Delete a stored file left behind by a rolled back upload or a released entry"""
+    if db.session.get(StoredFile, sha256) is None and os.path.exists(file_path):
+        os.remove(file_path)
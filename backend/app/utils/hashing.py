@@ -0,0 +1,5 @@
+import hashlib
+
+def text_hash(text):
+    """SHA-256 hex digest of a text, used to detect changed content"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
@@ -0,0 +1,103 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import wraps
+from flask import Response, current_app, jsonify, make_response, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import func
+from app import db
+from app.models import User
+
+VERSION_COLUMNS = {
+    'resumes': User.resumes_version,
+    'jobs': User.jobs_version,
+    'evaluations': User.evaluations_version
+}
+
+def bump_versions(user_id, *kinds):
+    """Mark kinds of a user's data as changed; commits with the caller's transaction"""
+    User.query.filter_by(id=user_id).update(
+        {VERSION_COLUMNS[kind]: func.coalesce(VERSION_COLUMNS[kind], 0) + 1 for kind in kinds},
+        synchronize_session=False
+    )
+
+def get_versions(user_id, kinds):
+    """Return the user's version counters for kinds, or None if the user no longer exists"""
+    row = db.session.query(*(VERSION_COLUMNS[kind] for kind in kinds)).filter(User.id == user_id).first()
+    return tuple(version or 0 for version in row) if row is not None else None
+
+class ResponseCache:
+    """Thread-safe LRU of serialized response bodies keyed by ETag, bounded by count and total bytes"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.size = 0
+    
+    def get(self, etag):
+        with self.lock:
+            body = self.entries.get(etag)
+            if body is not None:
+                self.entries.move_to_end(etag)
+            return body
+    
+    def put(self, etag, body, max_entries, max_bytes, max_body_bytes):
+        # Large bodies are not kept: one would evict many small ones
+        if len(body) > max_body_bytes:
+            return
+        with self.lock:
+            previous = self.entries.pop(etag, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self.entries[etag] = body
+            self.size += len(body)
+            while len(self.entries) > max_entries or self.size > max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+    
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+response_cache = ResponseCache()
+
+def cached_response(*kinds):
+    """
+    Serve a user's GET endpoint with a strong ETag derived from the version
+    counters of the data kinds it reads. A matching If-None-Match gets a 304
+    and an unchanged response is replayed from the LRU; either way the view
+    itself does not run. Apply below jwt_required.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            user_id = get_jwt_identity()
+            versions = get_versions(user_id, kinds)
+            if versions is None:
+                # A valid token can outlive its user
+                return jsonify({'error': 'Not Found', 'message': 'User not found'}), 404
+            key = repr((request.endpoint, user_id, sorted(kwargs.items()), request.query_string, versions))
+            etag = hashlib.sha256(key.encode()).hexdigest()[:32]
+            
+            if request.if_none_match.contains(etag):
+                response = Response(status=304)
+            else:
+                body = response_cache.get(etag)
+                if body is not None:
+                    response = Response(body, mimetype='application/json')
+                else:
+                    response = make_response(view(*args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+                    response_cache.put(
+                        etag, response.get_data(), current_app.config['RESPONSE_CACHE_SIZE'],
+                        current_app.config['RESPONSE_CACHE_MAX_BYTES'], current_app.config['RESPONSE_CACHE_MAX_BODY_BYTES']
+                    )
+            
+            response.set_etag(etag)
+            # Browsers may keep the body but must revalidate it on every use
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return wrapper
+    return decorator
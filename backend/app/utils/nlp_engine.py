@@ -1,4 +1,6 @@
 import re
+import sys
+from array import array
 from collections import Counter
 import math
 
@@ -12,6 +14,41 @@ STOP_WORDS = {
     'than', 'too', 'very', 'can', 'will', 'just', 'should', 'now'
 }
 
+# Longest token kept. Longer runs are mostly words PDF extraction ran
+# together, and terms.text holds at most 255 characters.
+MAX_TOKEN_LENGTH = 64
+
+# Runs of 3 to MAX_TOKEN_LENGTH lowercase alphanumerics: the words
+# preprocess_text would split out that pass tokenize's length filter, found
+# in a single scan. Longer runs are skipped whole rather than cut up.
+TOKEN_PATTERN = re.compile(rf'(?<![a-z0-9])[a-z0-9]{{3,{MAX_TOKEN_LENGTH}}}(?![a-z0-9])')
+
+class Vocabulary:
+    """Interned mapping between tokens and dense integer ids"""
+    
+    def __init__(self):
+        self.ids = {}
+        self.tokens = []
+    
+    def __len__(self):
+        return len(self.tokens)
+    
+    def add(self, token):
+        """Return the id of a token, assigning the next id if it is new"""
+        term_id = self.ids.get(token)
+        if term_id is None:
+            term_id = len(self.tokens)
+            token = sys.intern(token)
+            self.ids[token] = term_id
+            self.tokens.append(token)
+        return term_id
+    
+    def get(self, token):
+        return self.ids.get(token)
+    
+    def token(self, term_id):
+        return self.tokens[term_id]
+
 def preprocess_text(text):
     """Preprocess text: lowercase, remove special characters, tokenize"""
     text = text.lower()
@@ -21,8 +58,22 @@ def preprocess_text(text):
 
 def tokenize(text):
     """Tokenize text and remove stop words"""
-    words = preprocess_text(text).split()
-    return [w for w in words if w not in STOP_WORDS and len(w) > 2]
+    return [w for w in TOKEN_PATTERN.findall(text.lower()) if w not in STOP_WORDS]
+
+def count_terms(text, matcher=None):
+    """
+    Count a text's tokens and, given a skill matcher, the multi-word skills
+    and aliases it mentions under their canonical names. Words inside a
+    matched skill count towards the skill only.
+    """
+    if matcher is None:
+        return Counter(tokenize(text))
+    return matcher.count_terms(text)
+
+def tokenize_ids(text, vocabulary):
+    """Tokenize text into a compact array of vocabulary ids, interning new tokens"""
+    add = vocabulary.add
+    return array('I', [add(w) for w in TOKEN_PATTERN.findall(text.lower()) if w not in STOP_WORDS])
 
 def calculate_tf(tokens):
     """Calculate term frequency"""
@@ -103,21 +154,20 @@ def calculate_fit_score(resume_text, job_text):
         print(f"Error calculating fit score: {str(e)}")
         return 0.0
 
-def extract_matching_keywords(resume_text, job_text, top_n=10):
+def extract_matching_keywords(resume_text, job_text, top_n=10, matcher=None):
     """
     Extract matching keywords between resume and job description.
-    Returns a list of top matching keywords.
+    Returns a list of top matching keywords, including skill phrases when a
+    skill matcher is given.
     """
     if not resume_text or not job_text:
         return []
     
     try:
-        resume_tokens = set(tokenize(resume_text))
-        job_tokens = tokenize(job_text)
+        resume_tokens = set(count_terms(resume_text, matcher))
+        job_token_counts = count_terms(job_text, matcher)
         
-        matching_tokens = resume_tokens.intersection(set(job_tokens))
-        
-        job_token_counts = Counter(job_tokens)
+        matching_tokens = resume_tokens.intersection(job_token_counts)
         
         scored_matches = []
         for token in matching_tokens:
@@ -132,3 +182,105 @@ def extract_matching_keywords(resume_text, job_text, top_n=10):
     except Exception as e:
         print(f"Error extracting keywords: {str(e)}")
         return []
+
+def encode_term_vector(term_counts):
+    """Pack a {term_id: count} vector into little-endian uint32 (id, count) pairs"""
+    packed = array('I')
+    for term_id in sorted(term_counts):
+        packed.append(term_id)
+        packed.append(term_counts[term_id])
+    if sys.byteorder == 'big':
+        packed.byteswap()
+    return packed.tobytes()
+
+def decode_term_vector(data):
+    """Unpack a vector produced by encode_term_vector into a {term_id: count} dict"""
+    packed = array('I')
+    packed.frombytes(data)
+    if sys.byteorder == 'big':
+        packed.byteswap()
+    return dict(zip(packed[::2], packed[1::2]))
+
+def smooth_idf(doc_count, total_docs):
+    """Smoothed inverse document frequency; always positive, larger for rarer terms"""
+    return math.log((1 + total_docs) / (1 + doc_count)) + 1
+
+def _weighted_vector(vector, idf, default_idf):
+    total = sum(vector.values())
+    return {term: count / total * idf.get(term, default_idf) for term, count in vector.items()}
+
+def score_term_vectors_idf(resume_vectors, job_vector, idf, default_idf, top_n=10):
+    """
+    Score pre-tokenized resumes against one job using corpus-wide IDF weights.
+    idf maps a term to its weight; terms missing from it (e.g. job terms no
+    resume contains) get default_idf. Returns (fit_score, matching_terms)
+    tuples in input order, with matching terms ranked by their job weight.
+    """
+    if not job_vector:
+        return [(0.0, []) for _ in resume_vectors]
+    
+    job_weights = _weighted_vector(job_vector, idf, default_idf)
+    job_magnitude = math.sqrt(sum(value ** 2 for value in job_weights.values()))
+    keyword_ranking = sorted(job_weights, key=job_weights.get, reverse=True)
+    
+    results = []
+    for resume_vector in resume_vectors:
+        if not resume_vector or not job_magnitude:
+            results.append((0.0, []))
+            continue
+        
+        resume_weights = _weighted_vector(resume_vector, idf, default_idf)
+        resume_magnitude = math.sqrt(sum(value ** 2 for value in resume_weights.values()))
+        matches = [term for term in keyword_ranking if term in resume_weights]
+        dot_product = sum(job_weights[term] * resume_weights[term] for term in matches)
+        
+        similarity = dot_product / (job_magnitude * resume_magnitude) if resume_magnitude else 0.0
+        results.append((round(similarity * 100, 2), matches[:top_n]))
+    
+    return results
+
+def score_matrix_idf(resume_vectors, job_vectors, idf, default_idf, top_n=10):
+    """
+    Score many jobs against many resumes in one sparse product over an
+    inverted index of the resumes, so each job only visits the resumes
+    sharing a term with it. Returns one row per job of (fit_score,
+    matching_terms) tuples in resume order, identical to calling
+    score_term_vectors_idf once per job.
+    """
+    postings = {}
+    resume_magnitudes = []
+    for index, resume_vector in enumerate(resume_vectors):
+        if not resume_vector:
+            resume_magnitudes.append(0.0)
+            continue
+        resume_weights = _weighted_vector(resume_vector, idf, default_idf)
+        resume_magnitudes.append(math.sqrt(sum(value ** 2 for value in resume_weights.values())))
+        for term, weight in resume_weights.items():
+            postings.setdefault(term, []).append((index, weight))
+    
+    matrix = []
+    for job_vector in job_vectors:
+        row = [(0.0, [])] * len(resume_magnitudes)
+        if not job_vector:
+            matrix.append(row)
+            continue
+        
+        job_weights = _weighted_vector(job_vector, idf, default_idf)
+        job_magnitude = math.sqrt(sum(value ** 2 for value in job_weights.values()))
+        
+        # Walking terms by descending job weight accumulates each dot product
+        # and keyword list in the same order score_term_vectors_idf uses
+        dot_products = {}
+        matches = {}
+        for term in sorted(job_weights, key=job_weights.get, reverse=True):
+            job_weight = job_weights[term]
+            for index, weight in postings.get(term, ()):
+                dot_products[index] = dot_products.get(index, 0.0) + job_weight * weight
+                matches.setdefault(index, []).append(term)
+        
+        for index, dot_product in dot_products.items():
+            similarity = dot_product / (job_magnitude * resume_magnitudes[index]) if resume_magnitudes[index] else 0.0
+            row[index] = (round(similarity * 100, 2), matches[index][:top_n])
+        matrix.append(row)
+    
+    return matrix
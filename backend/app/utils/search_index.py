@@ -0,0 +1,168 @@
+import re
+from sqlalchemy import bindparam, inspect, text
+from sqlalchemy.orm import undefer
+from app import db
+from app.models import Resume
+
+# Resumes indexed per insert while rebuilding
+REBUILD_BATCH_SIZE = 500
+# Terms accepted per query, bounding the posting lists a query can merge
+MAX_QUERY_TERMS = 32
+
+SEARCH_TABLE = 'resume_search'
+
+# The owner column holds "u<user_id>", so a user's resumes are one posting
+# list that every query is intersected with, instead of a filter applied
+# after ranking every user's matches
+CREATE_SEARCH_TABLE = text(
+    f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5(owner, body, tokenize='unicode61 remove_diacritics 2')"
+)
+INSERT_SEARCH_ROW = text(f'INSERT INTO {SEARCH_TABLE} (rowid, owner, body) VALUES (:id, :owner, :body)')
+DELETE_SEARCH_ROW = text(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = :id')
+
+# Ranked by BM25 over the body only; lower scores are better matches.
+# BM25 is computed for every match, so snippets are left to a second query
+# over the returned page.
+SEARCH_QUERY = f"""
+    SELECT rowid, score FROM (
+        SELECT rowid, bm25({SEARCH_TABLE}, 0.0, 1.0) AS score
+        FROM {SEARCH_TABLE}
+        WHERE {SEARCH_TABLE} MATCH :match
+    )
+    {{after}}
+    ORDER BY score, rowid
+    LIMIT :limit
+"""
+SEARCH_AFTER = 'WHERE score > :score OR (score = :score AND rowid > :id)'
+SNIPPET_QUERY = text(f"""
+    SELECT rowid, snippet({SEARCH_TABLE}, 1, '', '', '...', 16)
+    FROM {SEARCH_TABLE}
+    WHERE {SEARCH_TABLE} MATCH :match AND rowid IN :ids
+""").bindparams(bindparam('ids', expanding=True))
+
+# Quoted phrases (optionally negated with -) or bare words
+QUERY_TOKEN = re.compile(r'(-?)"([^"]*)"|(\S+)')
+WORD_CHARACTER = re.compile(r'\w')
+
+def search_supported(bind=None):
+    """Full-text search is backed by SQLite's FTS5"""
+    return (bind or db.session.get_bind()).dialect.name == 'sqlite'
+
+def _owner(user_id):
+    return f'u{user_id}'
+
+def _quote(value):
+    return '"' + value.replace('"', '""') + '"'
+
+def build_match_expression(query, user_id):
+    """
+    Translate a search query into an FTS5 expression scoped to one user.
+    Words and "quoted phrases" must all match; OR between two of them
+    accepts either; a leading - excludes a word or phrase and a trailing *
+    matches a word prefix. Every term is quoted, so queries cannot use
+    FTS5 syntax such as column filters, and only matches the body column.
+    Raises ValueError for queries without any term to match.
+    """
+    groups = []
+    excluded = []
+    join_next = False
+    for match in QUERY_TOKEN.finditer(query):
+        negate, phrase, word = match.groups()
+        if word is not None:
+            if word in ('OR', '|'):
+                join_next = bool(groups)
+                continue
+            if word == 'AND':
+                continue
+            negate = word.startswith('-')
+            word = word.lstrip('-')
+            prefix = word.endswith('*')
+            word = word.rstrip('*')
+            if not WORD_CHARACTER.search(word):
+                continue
+            term = _quote(word) + ('*' if prefix else '')
+        else:
+            if not WORD_CHARACTER.search(phrase):
+                continue
+            term = _quote(phrase)
+        
+        if negate:
+            excluded.append(term)
+        elif join_next:
+            groups[-1].append(term)
+        else:
+            groups.append([term])
+        join_next = False
+    
+    if not groups:
+        raise ValueError('Query must contain at least one word or phrase to match')
+    if sum(len(group) for group in groups) + len(excluded) > MAX_QUERY_TERMS:
+        raise ValueError(f'Query may contain at most {MAX_QUERY_TERMS} terms')
+    
+    # Without a column filter terms would match the owner column too
+    terms = ' AND '.join('(' + ' OR '.join(group) + ')' for group in groups)
+    expression = f'owner:{_quote(_owner(user_id))} AND body:({terms})'
+    for term in excluded:
+        expression = f'({expression}) NOT body:{term}'
+    return expression
+
+def search_resumes(query, user_id, limit, after=None):
+    """
+    Return up to limit (resume_id, score, snippet) tuples of the user's
+    resumes matching query, best first. after is the (score, resume_id) of
+    the last row of the previous page.
+    """
+    match = build_match_expression(query, user_id)
+    params = {'match': match, 'limit': limit}
+    if after is not None:
+        params['score'], params['id'] = after
+    statement = text(SEARCH_QUERY.format(after=SEARCH_AFTER if after is not None else ''))
+    rows = db.session.execute(statement, params).all()
+    if not rows:
+        return []
+    
+    snippets = dict(db.session.execute(SNIPPET_QUERY, {'match': match, 'ids': [row.rowid for row in rows]}).all())
+    return [(row.rowid, row.score, snippets.get(row.rowid, '')) for row in rows]
+
+def index_resume(resume):
+    """Add a flushed resume to the search index in the current transaction"""
+    if search_supported():
+        db.session.execute(INSERT_SEARCH_ROW, {'id': resume.id, 'owner': _owner(resume.user_id), 'body': resume.extracted_text})
+
+def unindex_resume(resume):
+    """Remove a resume from the search index in the current transaction"""
+    if search_supported():
+        db.session.execute(DELETE_SEARCH_ROW, {'id': resume.id})
+
+def rebuild_search_index():
+    """Re-index every resume from its stored text; returns how many were indexed"""
+    db.session.execute(text(f'DELETE FROM {SEARCH_TABLE}'))
+    indexed = 0
+    last_id = 0
+    while True:
+        batch = Resume.query.options(undefer(Resume.extracted_text)).filter(
+            Resume.id > last_id
+        ).order_by(Resume.id).limit(REBUILD_BATCH_SIZE).all()
+        if not batch:
+            break
+        
+        db.session.execute(INSERT_SEARCH_ROW, [
+            {'id': resume.id, 'owner': _owner(resume.user_id), 'body': resume.extracted_text} for resume in batch
+        ])
+        db.session.commit()
+        indexed += len(batch)
+        last_id = batch[-1].id
+    db.session.commit()
+    return indexed
+
+def create_search_index():
+    """
+    Create the search table when missing, indexing the resumes already in
+    the database. Returns whether it was created.
+    """
+    if not search_supported(db.engine) or SEARCH_TABLE in inspect(db.engine).get_table_names():
+        return False
+    with db.engine.begin() as connection:
+        connection.execute(CREATE_SEARCH_TABLE)
+    rebuild_search_index()
+    return True
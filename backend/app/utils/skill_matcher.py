@@ -0,0 +1,182 @@
+import os
+import re
+import threading
+from collections import Counter, deque
+from flask import current_app, has_app_context
+from app.utils.nlp_engine import TOKEN_PATTERN, STOP_WORDS
+
+DEFAULT_SKILLS_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'skills.txt')
+
+# Whitespace, hyphens and underscores all separate words, so "front-end",
+# "front_end" and "front  end" match the same phrase
+SEPARATOR_PATTERN = re.compile(r'[\s\-_]+')
+
+# Characters that make up tokens; a match must not run into one of these
+WORD_CHARS = frozenset('abcdefghijklmnopqrstuvwxyz0123456789')
+
+def normalize_phrase(text):
+    """Lowercase text and collapse separator runs into single spaces"""
+    return SEPARATOR_PATTERN.sub(' ', text.lower())
+
+def is_token(phrase):
+    """Whether tokenize already counts a phrase as a single token"""
+    return TOKEN_PATTERN.fullmatch(phrase) is not None and phrase not in STOP_WORDS
+
+class AhoCorasick:
+    """
+    Character automaton finding every occurrence of a set of patterns in one
+    pass over a text. Building it is linear in the total pattern length;
+    scanning is linear in the text length plus the number of matches, however
+    many patterns there are.
+    """
+    
+    def __init__(self, patterns):
+        self.goto = [{}]
+        self.fail = [0]
+        self.outputs = [()]
+        for pattern, value in patterns:
+            node = 0
+            for char in pattern:
+                child = self.goto[node].get(char)
+                if child is None:
+                    child = len(self.goto)
+                    self.goto[node][char] = child
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.outputs.append(())
+                node = child
+            self.outputs[node] += ((len(pattern), value),)
+        
+        # Breadth-first, so every fail target is complete before it is used
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                state = self.fail[node]
+                while state and char not in self.goto[state]:
+                    state = self.fail[state]
+                self.fail[child] = self.goto[state].get(char, 0)
+                self.outputs[child] += self.outputs[self.fail[child]]
+    
+    def __len__(self):
+        return len(self.goto)
+    
+    def finditer(self, text):
+        """Yield (start, end, value) for every pattern occurrence, overlaps included"""
+        goto = self.goto
+        fail = self.fail
+        outputs = self.outputs
+        node = 0
+        for end, char in enumerate(text, 1):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if outputs[node]:
+                for length, value in outputs[node]:
+                    yield end - length, end, value
+
+class SkillMatcher:
+    """
+    Counts the skills a text mentions, by canonical name, from a dictionary
+    of {canonical: [aliases]}. Overlapping matches keep the leftmost-longest
+    one, so "node.js" is not also counted as "node" and "js". Canonical names
+    that are already single tokens are only matched through their aliases,
+    and count_terms leaves out the words inside a match, so no word is
+    counted twice.
+    """
+    
+    def __init__(self, skills):
+        patterns = {}
+        for canonical, aliases in skills.items():
+            canonical = normalize_phrase(canonical).strip()
+            for surface in [canonical, *aliases]:
+                surface = normalize_phrase(surface).strip()
+                if surface and not (surface == canonical and is_token(canonical)):
+                    patterns.setdefault(surface, canonical)
+        self.size = len(patterns)
+        self.automaton = AhoCorasick(patterns.items())
+    
+    def matches(self, text):
+        """
+        Return (start, end, canonical) for the skills in already normalized
+        text, in order and without overlaps
+        """
+        length = len(text)
+        matches = []
+        for start, end, canonical in self.automaton.finditer(text):
+            # Only edges that are word characters need a boundary, so "c++"
+            # matches in "c++11" but "java" does not match in "javascript"
+            if start and text[start] in WORD_CHARS and text[start - 1] in WORD_CHARS:
+                continue
+            if end < length and text[end - 1] in WORD_CHARS and text[end] in WORD_CHARS:
+                continue
+            matches.append((start, -end, canonical))
+        
+        kept = []
+        covered = 0
+        for start, end, canonical in sorted(matches):
+            if start >= covered:
+                kept.append((start, -end, canonical))
+                covered = -end
+        return kept
+    
+    def count(self, text):
+        """Return {canonical skill: occurrences} for the skills in text"""
+        return Counter(canonical for _, _, canonical in self.matches(normalize_phrase(text)))
+    
+    def count_terms(self, text):
+        """
+        Count text's skills and its tokens outside them, so "machine learning"
+        is not also counted as "machine" and "learning", nor "k8s" as both
+        "k8s" and "kubernetes"
+        """
+        # Separators are never part of a token, so normalizing leaves the
+        # tokens tokenize finds unchanged
+        text = normalize_phrase(text)
+        matches = self.matches(text)
+        counts = Counter(canonical for _, _, canonical in matches)
+        
+        spans = iter(matches)
+        span = next(spans, None)
+        for token in TOKEN_PATTERN.finditer(text):
+            while span is not None and span[1] <= token.start():
+                span = next(spans, None)
+            if span is not None and span[0] < token.end():
+                continue
+            if token.group() not in STOP_WORDS:
+                counts[token.group()] += 1
+        return counts
+
+def read_skills(path):
+    """
+    Parse a skills file: one skill per line as "canonical | alias | ...",
+    with blank lines and lines starting with # ignored.
+    """
+    skills = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            canonical, *aliases = [name.strip() for name in line.split('|')]
+            skills.setdefault(canonical, []).extend(alias for alias in aliases if alias)
+    return skills
+
+_matchers = {}
+_matchers_lock = threading.Lock()
+
+def load_skill_matcher(path):
+    """Return the matcher for a skills file, compiled once per process; None disables matching"""
+    if not path:
+        return None
+    with _matchers_lock:
+        matcher = _matchers.get(path)
+        if matcher is None:
+            matcher = _matchers[path] = SkillMatcher(read_skills(path))
+    return matcher
+
+def current_skill_matcher():
+    """Matcher for the app's SKILLS_FILE, or the bundled dictionary outside an app"""
+    path = current_app.config.get('SKILLS_FILE') if has_app_context() else DEFAULT_SKILLS_FILE
+    return load_skill_matcher(path)
@@ -0,0 +1,60 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from sqlalchemy.orm import load_only
+from app import db
+from app.models import Job, Resume, EvaluationTask
+from app.utils.executors import LazyExecutor
+from app.utils.evaluations import prune_stale_evaluations, add_evaluations, evaluation_scorer
+
+_executor = LazyExecutor(lambda config: ThreadPoolExecutor(
+    max_workers=config['EVALUATION_WORKERS'],
+    thread_name_prefix='evaluation'
+))
+
+def submit_evaluation_task(app, task_id):
+    """Run an evaluation task on the in-process worker pool"""
+    return _executor.get(app.config).submit(run_evaluation_task, app, task_id)
+
+def run_evaluation_task(app, task_id):
+    """
+    Score a job's new or changed resumes in chunks, committing evaluations
+    and progress after each chunk so pollers see partial results. Each
+    commit also refreshes the task's heartbeat.
+    """
+    with app.app_context():
+        task = db.session.get(EvaluationTask, task_id)
+        # A task that was abandoned while queued has been replaced already
+        if task is None or task.status != EvaluationTask.PENDING:
+            db.session.remove()
+            return
+        
+        try:
+            task.status = EvaluationTask.RUNNING
+            job = db.session.get(Job, task.job_id)
+            resumes = Resume.query.filter_by(user_id=task.user_id).options(load_only(Resume.id, Resume.text_hash)).all()
+            pending_ids = [resume.id for resume in prune_stale_evaluations(job, resumes, bool(task.rescore))]
+            task.total = len(pending_ids)
+            db.session.commit()
+            
+            # The job is weighted against the corpus IDF once for the whole task
+            scorer = evaluation_scorer(job) if pending_ids else None
+            chunk_size = app.config['EVALUATION_CHUNK_SIZE']
+            for start in range(0, len(pending_ids), chunk_size):
+                chunk = pending_ids[start:start + chunk_size]
+                add_evaluations(job, chunk, chunk_size, scorer)
+                task.processed += len(chunk)
+                db.session.commit()
+            
+            task.status = EvaluationTask.COMPLETED
+            task.finished_at = datetime.utcnow()
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            task = db.session.get(EvaluationTask, task_id)
+            if task is not None:
+                task.status = EvaluationTask.FAILED
+                task.error = str(e)
+                task.finished_at = datetime.utcnow()
+                db.session.commit()
+        finally:
+            db.session.remove()
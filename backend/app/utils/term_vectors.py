@@ -0,0 +1,194 @@
+import importlib
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import undefer
+from app import db
+from app.database import IN_CHUNK_SIZE
+from app.models import Term, Resume, DocumentFrequency
+from app.instrumentation import timed
+from app.utils.skill_matcher import current_skill_matcher
+from app.utils.nlp_engine import (
+    count_terms, encode_term_vector, decode_term_vector, smooth_idf, score_term_vectors_idf, score_matrix_idf
+)
+
+# Rows per multi-row upsert (three bound parameters each)
+UPSERT_CHUNK_SIZE = 300
+# Resumes loaded per batch while filling in missing term vectors
+FILL_BATCH_SIZE = 500
+# Dialects with INSERT ... ON CONFLICT, imported on first use
+UPSERT_DIALECTS = {'sqlite': 'sqlalchemy.dialects.sqlite', 'postgresql': 'sqlalchemy.dialects.postgresql'}
+
+def lookup_terms(tokens):
+    """Return {token: term_id} for the tokens already in the vocabulary"""
+    tokens = list(set(tokens))
+    term_ids = {}
+    for start in range(0, len(tokens), IN_CHUNK_SIZE):
+        chunk = tokens[start:start + IN_CHUNK_SIZE]
+        term_ids.update(db.session.query(Term.text, Term.id).filter(Term.text.in_(chunk)))
+    return term_ids
+
+def _add_terms(tokens):
+    with db.session.begin_nested():
+        new_terms = [Term(text=token) for token in tokens]
+        db.session.add_all(new_terms)
+    return {term.text: term.id for term in new_terms}
+
+def intern_terms(tokens):
+    """Return {token: term_id} for every token, adding unseen ones to the vocabulary"""
+    term_ids = lookup_terms(tokens)
+    missing = set(tokens) - term_ids.keys()
+    if missing:
+        try:
+            term_ids.update(_add_terms(missing))
+        except IntegrityError:
+            # A concurrent upload interned some of these terms first
+            term_ids = lookup_terms(tokens)
+            term_ids.update(_add_terms(set(tokens) - term_ids.keys()))
+    return term_ids
+
+def encode_token_counts(counts):
+    """Encode {token: count} against the shared vocabulary, interning new tokens"""
+    term_ids = intern_terms(counts)
+    return encode_term_vector({term_ids[token]: count for token, count in counts.items()})
+
+@timed('tokenize')
+def build_term_vector(text):
+    """Count text's tokens and skill phrases and encode them against the shared vocabulary"""
+    return encode_token_counts(count_terms(text, current_skill_matcher()))
+
+def update_document_frequencies(user_id, term_ids, delta):
+    """Add delta to the user's document frequency of each term"""
+    term_ids = list(term_ids)
+    dialect_module = UPSERT_DIALECTS.get(db.session.get_bind().dialect.name)
+    upsert = importlib.import_module(dialect_module).insert if dialect_module else None
+    
+    for start in range(0, len(term_ids), UPSERT_CHUNK_SIZE):
+        chunk = term_ids[start:start + UPSERT_CHUNK_SIZE]
+        
+        if delta > 0 and upsert is not None:
+            statement = upsert(DocumentFrequency).values([
+                {'user_id': user_id, 'term_id': term_id, 'doc_count': delta} for term_id in chunk
+            ])
+            db.session.execute(statement.on_conflict_do_update(
+                index_elements=['user_id', 'term_id'],
+                set_={'doc_count': DocumentFrequency.doc_count + statement.excluded.doc_count}
+            ))
+            continue
+        
+        rows = DocumentFrequency.query.filter(
+            DocumentFrequency.user_id == user_id,
+            DocumentFrequency.term_id.in_(chunk)
+        )
+        existing = {term_id for (term_id,) in rows.with_entities(DocumentFrequency.term_id)} if delta > 0 else ()
+        rows.update({'doc_count': DocumentFrequency.doc_count + delta}, synchronize_session=False)
+        
+        if delta > 0:
+            new_rows = [
+                {'user_id': user_id, 'term_id': term_id, 'doc_count': delta}
+                for term_id in chunk if term_id not in existing
+            ]
+            if new_rows:
+                db.session.execute(DocumentFrequency.__table__.insert(), new_rows)
+        else:
+            rows.filter(DocumentFrequency.doc_count <= 0).delete(synchronize_session=False)
+
+def assign_term_vector(resume, term_vector):
+    """Store a resume's encoded vector, keeping its user's document frequencies in step"""
+    release_term_vector(resume)
+    resume.term_vector = term_vector
+    update_document_frequencies(resume.user_id, decode_term_vector(term_vector), 1)
+
+def release_term_vector(resume):
+    """Remove a resume's terms from its user's document frequencies"""
+    if resume.term_vector is not None:
+        update_document_frequencies(resume.user_id, decode_term_vector(resume.term_vector), -1)
+
+def get_term_vector(resume):
+    """Decode a resume's stored vector, computing and storing it if missing"""
+    if resume.term_vector is None:
+        assign_term_vector(resume, build_term_vector(resume.extracted_text))
+    return decode_term_vector(resume.term_vector)
+
+def fill_term_vectors(user_id):
+    """
+    Compute and store the vectors of the user's resumes that have none, e.g.
+    ones uploaded before vectors were stored. Run this before load_idf: the
+    corpus IDF and the vocabulary only cover resumes that have a vector.
+    """
+    last_id = 0
+    while True:
+        batch = Resume.query.options(undefer(Resume.extracted_text)).filter(
+            Resume.user_id == user_id,
+            Resume.term_vector.is_(None),
+            Resume.id > last_id
+        ).order_by(Resume.id).limit(FILL_BATCH_SIZE).all()
+        if not batch:
+            break
+        
+        for resume in batch:
+            assign_term_vector(resume, build_term_vector(resume.extracted_text))
+        db.session.flush()
+        last_id = batch[-1].id
+
+def corpus_size(user_id):
+    """Number of the user's resumes counted in their document frequencies"""
+    return db.session.query(func.count(Resume.id)).filter(
+        Resume.user_id == user_id,
+        Resume.term_vector.isnot(None)
+    ).scalar()
+
+def load_idf(user_id):
+    """
+    Return ({term_id: idf}, default_idf) over the user's resume corpus.
+    default_idf is the weight of a term that no resume contains.
+    """
+    total_docs = corpus_size(user_id)
+    rows = db.session.query(DocumentFrequency.term_id, DocumentFrequency.doc_count).filter(
+        DocumentFrequency.user_id == user_id
+    )
+    return {term_id: smooth_idf(doc_count, total_docs) for term_id, doc_count in rows}, smooth_idf(0, total_docs)
+
+def job_scorer(job_text, user_id, top_n=10):
+    """
+    Weight a job description against the user's corpus IDF once and return a
+    function scoring a list of decoded resume term vectors with it, as
+    (fit_score, matching_keywords) tuples in input order.
+    """
+    idf, default_idf = load_idf(user_id)
+    
+    # Job terms missing from the vocabulary keep their token as key: they
+    # cannot match any resume but still count towards the job's magnitude.
+    job_counts = count_terms(job_text, current_skill_matcher())
+    term_ids = lookup_terms(job_counts)
+    job_vector = {term_ids.get(token, token): count for token, count in job_counts.items()}
+    id_to_token = {term_id: token for token, term_id in term_ids.items()}
+    
+    def score(resume_vectors):
+        scores = score_term_vectors_idf(resume_vectors, job_vector, idf, default_idf, top_n)
+        return [(fit_score, [id_to_token[term_id] for term_id in matches]) for fit_score, matches in scores]
+    
+    return score
+
+@timed('score')
+def score_jobs_for_resumes(jobs, resumes, user_id, top_n=10):
+    """
+    Score every job against every resume in a single sparse product.
+    Returns one row per job of (fit_score, matching_keywords) tuples in
+    resume order, matching what job_scorer gives per job.
+    """
+    resume_vectors = [get_term_vector(resume) for resume in resumes]
+    idf, default_idf = load_idf(user_id)
+    
+    # One vocabulary lookup covers every job; unknown tokens stay as keys
+    # as in job_scorer
+    matcher = current_skill_matcher()
+    job_counts = [count_terms(job.description, matcher) for job in jobs]
+    term_ids = lookup_terms(token for counts in job_counts for token in counts)
+    job_vectors = [{term_ids.get(token, token): count for token, count in counts.items()} for counts in job_counts]
+    id_to_token = {term_id: token for token, term_id in term_ids.items()}
+    
+    matrix = score_matrix_idf(resume_vectors, job_vectors, idf, default_idf, top_n)
+    return [
+        [(fit_score, [id_to_token[term_id] for term_id in matches]) for fit_score, matches in row]
+        for row in matrix
+    ]
@@ -0,0 +1,40 @@
+"""
+Compare two benchmark result files produced by benchmarks.run.
+
+    python -m benchmarks.compare baseline.json results.json --threshold 0.10
+
+Exits with status 1 when any benchmark's median got slower than the threshold.
+"""
+import argparse
+import json
+import sys
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--threshold', type=float, default=0.10, help='allowed relative slowdown of the median')
+    args = parser.parse_args(argv)
+    
+    with open(args.baseline) as f:
+        baseline = json.load(f)['results']
+    with open(args.candidate) as f:
+        candidate = json.load(f)['results']
+    
+    regressions = 0
+    print(f'{"size":>7} {"benchmark":<28} {"baseline ms":>12} {"candidate ms":>13} {"ratio":>7}')
+    for size in sorted(set(baseline) & set(candidate), key=int):
+        for name in sorted(set(baseline[size]) & set(candidate[size])):
+            old = baseline[size][name]['median']
+            new = candidate[size][name]['median']
+            ratio = new / old if old else float('inf')
+            flag = ''
+            if ratio > 1 + args.threshold:
+                flag = '  REGRESSION'
+                regressions += 1
+            print(f'{size:>7} {name:<28} {old * 1000:12.2f} {new * 1000:13.2f} {ratio:7.2f}{flag}')
+    
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""Seeded synthetic resumes, job descriptions and PDFs for benchmarks."""
+import random
+import textwrap
+
+SKILLS = [
+    'python', 'java', 'javascript', 'typescript', 'react', 'angular', 'vue', 'node', 'django',
+    'flask', 'spring', 'kotlin', 'swift', 'golang', 'rust', 'scala', 'ruby', 'rails', 'php',
+    'laravel', 'sql', 'postgresql', 'mysql', 'mongodb', 'redis', 'kafka', 'rabbitmq', 'docker',
+    'kubernetes', 'terraform', 'ansible', 'aws', 'azure', 'gcp', 'linux', 'bash', 'git',
+    'jenkins', 'graphql', 'rest', 'microservices', 'pandas', 'numpy', 'tensorflow', 'pytorch',
+    'spark', 'hadoop', 'airflow', 'tableau', 'excel', 'figma', 'selenium', 'cypress', 'jest',
+    'agile', 'scrum', 'jira', 'html', 'css', 'sass', 'webpack', 'elasticsearch', 'nginx',
+    'security', 'networking', 'devops', 'testing', 'analytics', 'statistics', 'leadership'
+]
+
+FILLER = [
+    'designed', 'built', 'delivered', 'maintained', 'improved', 'migrated', 'automated',
+    'collaborated', 'mentored', 'launched', 'scaled', 'reduced', 'increased', 'owned',
+    'platform', 'service', 'pipeline', 'dashboard', 'system', 'feature', 'product', 'team',
+    'customers', 'latency', 'reliability', 'performance', 'revenue', 'costs', 'deployment',
+    'architecture', 'stakeholders', 'requirements', 'roadmap', 'release', 'quality',
+    'experience', 'years', 'strong', 'knowledge', 'responsible', 'across', 'multiple',
+    'projects', 'using', 'including', 'production', 'environment', 'high', 'traffic'
+]
+
+STOP = ['the', 'and', 'with', 'for', 'to', 'of', 'in', 'a', 'on', 'by']
+
+SECTIONS = ['Summary', 'Experience', 'Education', 'Skills', 'Projects', 'Certifications']
+
+def _sentence(rng, skills, length):
+    words = []
+    for _ in range(length):
+        roll = rng.random()
+        if roll < 0.25:
+            words.append(rng.choice(skills))
+        elif roll < 0.45:
+            words.append(rng.choice(STOP))
+        else:
+            words.append(rng.choice(FILLER))
+    return ' '.join(words).capitalize() + '.'
+
+def generate_document(rng, word_count, skills=None):
+    """One document of roughly word_count words, in titled sections"""
+    skills = skills or rng.sample(SKILLS, 15)
+    lines = []
+    written = 0
+    while written < word_count:
+        lines.append(rng.choice(SECTIONS))
+        for _ in range(rng.randint(2, 5)):
+            length = rng.randint(8, 20)
+            lines.append(_sentence(rng, skills, length))
+            written += length
+    return '\n'.join(lines)
+
+def generate_resume(rng):
+    return generate_document(rng, rng.randint(400, 800))
+
+def generate_job(rng):
+    return generate_document(rng, rng.randint(250, 400))
+
+def generate_corpus(resume_count, seed=42):
+    """Return (job_description, [resume_text, ...]) for a given pool size"""
+    rng = random.Random(seed)
+    job = generate_job(rng)
+    return job, [generate_resume(rng) for _ in range(resume_count)]
+
+def _pdf_escape(line):
+    return line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+def generate_pdf(text, lines_per_page=50):
+    """Render text as a minimal multi-page PDF with one Helvetica text line per row"""
+    lines = [wrapped for line in text.split('\n') for wrapped in textwrap.wrap(line, 90) or ['']]
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    
+    kids = ' '.join(f'{4 + 2 * i} 0 R' for i in range(len(pages)))
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        f'<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>'.encode(),
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>'
+    ]
+    for i, page_lines in enumerate(pages):
+        content = 'BT /F1 10 Tf 50 760 Td 14 TL ' + ' '.join(f'({_pdf_escape(line)}) Tj T*' for line in page_lines) + ' ET'
+        objects.append(
+            f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+            f'/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>'.encode()
+        )
+        objects.append(f'<< /Length {len(content)} >>\nstream\n{content}\nendstream'.encode('latin-1'))
+    
+    output = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += f'{number} 0 obj\n'.encode() + body + b'\nendobj\n'
+    
+    xref_offset = len(output)
+    output += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode()
+    for offset in offsets:
+        output += f'{offset:010d} 00000 n \n'.encode()
+    output += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n'.encode()
+    return bytes(output)
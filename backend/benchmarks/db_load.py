@@ -0,0 +1,193 @@
+"""
+Load benchmark of the database profiles: concurrent uploads, evaluations and
+result reads against a SQLite database shared by many users.
+
+Run from the backend directory:
+
+    python -m benchmarks.db_load --users 20 --resumes 200 --threads 8 --duration 20
+
+Each profile runs on a fresh database seeded identically:
+
+    baseline     development config without the foreign-key indexes
+    development  development config (no SQLite pragmas)
+    production   ProductionConfig (WAL, synchronous=NORMAL, busy_timeout, cache)
+"""
+import argparse
+import io
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from benchmarks.corpus import generate_job, generate_resume
+from benchmarks.run import git_revision
+
+FOREIGN_KEY_INDEXES = ['ix_resumes_user_id', 'ix_jobs_user_id', 'ix_evaluations_resume_id', 'ix_evaluation_tasks_job_id']
+
+def seed_database(app, users, resumes_per_user, seed):
+    from app import db
+    from app.models import User, Resume, Job
+    from app.utils.hashing import text_hash
+    from app.utils.term_vectors import build_term_vector, assign_term_vector
+    
+    rng = random.Random(seed)
+    with app.app_context():
+        accounts = []
+        for i in range(users):
+            user = User(email=f'load{i}@example.com')
+            user.set_password('benchmark')
+            db.session.add(user)
+            db.session.flush()
+            
+            for j in range(resumes_per_user):
+                text = generate_resume(rng)
+                resume = Resume(
+                    user_id=user.id,
+                    filename=f'resume_{j}.txt',
+                    file_path=f'resume_{i}_{j}.txt',
+                    extracted_text=text,
+                    text_hash=text_hash(text)
+                )
+                assign_term_vector(resume, build_term_vector(text))
+                db.session.add(resume)
+            job = Job(user_id=user.id, title='Load test', description=generate_job(rng))
+            db.session.add(job)
+            db.session.commit()
+            accounts.append((user.email, job.id))
+    return accounts
+
+def drop_indexes(app, names):
+    from sqlalchemy import text
+    from app import db
+    
+    with app.app_context():
+        with db.engine.begin() as connection:
+            for name in names:
+                connection.execute(text(f'DROP INDEX IF EXISTS {name}'))
+
+def run_worker(app, email, job_id, seed, deadline, upload_share, samples, failures):
+    rng = random.Random(seed)
+    client = app.test_client()
+    token = client.post('/api/auth/login', json={'email': email, 'password': 'benchmark'}).get_json()['access_token']
+    headers = {'Authorization': f'Bearer {token}'}
+    
+    while time.perf_counter() < deadline:
+        roll = rng.random()
+        started = time.perf_counter()
+        if roll < upload_share:
+            kind = 'upload'
+            data = {'file': (io.BytesIO(generate_resume(rng).encode()), 'resume.txt')}
+            response = client.post('/api/resumes/upload', headers=headers, data=data, content_type='multipart/form-data')
+        elif roll < upload_share + (1 - upload_share) / 2:
+            kind = 'evaluate'
+            response = client.post('/api/evaluate', headers=headers, json={'job_id': job_id})
+        else:
+            kind = 'results'
+            response = client.get(f'/api/evaluate/{job_id}?top_k=20', headers=headers)
+        elapsed = time.perf_counter() - started
+        
+        if response.status_code >= 500:
+            failures.append((kind, response.get_json().get('message')))
+        else:
+            samples.append((kind, elapsed))
+
+def run_profile(name, config_class, args):
+    from app import create_app
+    from app.database import init_database
+    
+    workdir = tempfile.mkdtemp(prefix=f'bench-db-{name}-')
+    config = type(f'{name.title()}LoadConfig', (config_class,), {
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(workdir, 'load.db'),
+        'UPLOAD_FOLDER': os.path.join(workdir, 'uploads'),
+        'INDEX_DIR': os.path.join(workdir, 'indexes'),
+        'SERVER_TIMING_HEADER': False
+    })
+    
+    try:
+        app = create_app(config)
+        with app.app_context():
+            init_database()
+        accounts = seed_database(app, args.users, args.resumes, args.seed)
+        if name == 'baseline':
+            drop_indexes(app, FOREIGN_KEY_INDEXES)
+        
+        samples = []
+        failures = []
+        deadline = time.perf_counter() + args.duration
+        threads = [
+            threading.Thread(target=run_worker, args=(
+                app, *accounts[i % len(accounts)], args.seed + i, deadline, args.upload_share, samples, failures
+            ))
+            for i in range(args.threads)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        result = {
+            'requests': len(samples),
+            'failures': len(failures),
+            'throughput_rps': len(samples) / args.duration
+        }
+        for kind in ('upload', 'evaluate', 'results'):
+            timings = sorted(elapsed for sample_kind, elapsed in samples if sample_kind == kind)
+            if timings:
+                result[kind] = {
+                    'count': len(timings),
+                    'median': statistics.median(timings),
+                    'p95': timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+                }
+        if failures:
+            result['first_failure'] = failures[0]
+        return result
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def main(argv=None):
+    from app.config import Config, ProductionConfig
+    
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=20, help='users, each with their own resumes and job')
+    parser.add_argument('--resumes', type=int, default=200, help='resumes seeded per user')
+    parser.add_argument('--threads', type=int, default=8, help='concurrent clients')
+    parser.add_argument('--duration', type=float, default=20, help='seconds of load per profile')
+    parser.add_argument('--upload-share', type=float, default=0.2, help='fraction of requests that upload a resume')
+    parser.add_argument('--seed', type=int, default=42, help='corpus generator seed')
+    parser.add_argument('--profiles', default='baseline,development,production', help='comma-separated profiles to run')
+    parser.add_argument('--output', default='db_load_results.json', help='where to write the JSON results')
+    args = parser.parse_args(argv)
+    
+    profiles = {'baseline': Config, 'development': Config, 'production': ProductionConfig}
+    results = {}
+    for name in filter(None, args.profiles.split(',')):
+        results[name] = run_profile(name, profiles[name], args)
+        print(f'{name:<12} {results[name]["throughput_rps"]:8.1f} req/s  {results[name]["failures"]} failures')
+    
+    report = {
+        'meta': {
+            'created_at': datetime.utcnow().isoformat(),
+            'git_revision': git_revision(),
+            'python': sys.version.split()[0],
+            'cpu_count': os.cpu_count(),
+            'users': args.users,
+            'resumes': args.resumes,
+            'threads': args.threads,
+            'duration': args.duration,
+            'upload_share': args.upload_share,
+            'seed': args.seed
+        },
+        'results': results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'Wrote {args.output}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,345 @@
+"""
+End-to-end load test: many recruiters uploading, evaluating and reading
+results at once over real HTTP.
+
+Run from the backend directory:
+
+    python -m benchmarks.load_test --users 50 --duration 60 --output load_test.json
+
+By default a server is started locally in a subprocess on a fresh SQLite
+database (--profile development or production). Pass --url to drive a
+server that is already running instead, e.g. one started with gunicorn.
+
+Every user is seeded through the public routes (register, login, resume
+uploads, jobs, a first evaluation) before the timed run. Each client thread
+then acts as one user and picks requests from the --mix weights:
+
+    upload    POST /api/resumes/upload
+    evaluate  POST /api/evaluate
+    results   GET  /api/evaluate/<job_id>?top_k=20
+    resumes   GET  /api/resumes
+    jobs      GET  /api/jobs
+    export    GET  /api/evaluate/<job_id>/export
+
+The report gives throughput, p50/p95/p99 latency and error rates per
+endpoint, with SQLite "database is locked" failures counted separately.
+--max-error-rate and --max-p95-ms make the exit status fail the run so it
+can gate a release.
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from benchmarks.corpus import generate_job, generate_resume
+from benchmarks.run import git_revision
+
+DEFAULT_MIX = 'upload:2,evaluate:1,results:4,resumes:1,jobs:1,export:1'
+
+# Attempts per seeding request that fails with "database is locked"
+SEED_RETRIES = 6
+
+class Client:
+    """Minimal JSON/multipart HTTP client for one user"""
+    
+    def __init__(self, base_url, timeout):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.token = None
+    
+    def request(self, method, path, json_body=None, files=None):
+        """Return (status, body bytes); connection failures raise OSError"""
+        headers = {}
+        data = None
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        if json_body is not None:
+            data = json.dumps(json_body).encode()
+            headers['Content-Type'] = 'application/json'
+        elif files:
+            data, headers['Content-Type'] = encode_multipart(files)
+        
+        request = urllib.request.Request(self.base_url + path, data=data, headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+    
+    def login(self, email, password):
+        self.request('POST', '/api/auth/register', {'email': email, 'password': password})
+        status, body = self.request('POST', '/api/auth/login', {'email': email, 'password': password})
+        if status != 200:
+            raise RuntimeError(f'login failed for {email}: {status} {body[:200]!r}')
+        self.token = json.loads(body)['access_token']
+
+def encode_multipart(files):
+    """Encode {field: (filename, bytes)} as multipart/form-data"""
+    boundary = uuid.uuid4().hex
+    parts = []
+    for field, (filename, content) in files.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+            f'Content-Type: application/octet-stream\r\n\r\n'.encode() + content + b'\r\n'
+        )
+    parts.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+def classify_error(status, body):
+    """Name the failure of a response, or None when it succeeded"""
+    if status < 400:
+        return None
+    if b'database is locked' in body:
+        return 'db_locked'
+    return 'server_error' if status >= 500 else 'client_error'
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, max(int(round(fraction * len(sorted_values))) - 1, 0))]
+
+def parse_mix(mix):
+    weights = {}
+    for item in filter(None, mix.split(',')):
+        name, _, weight = item.partition(':')
+        if name not in OPERATIONS:
+            raise SystemExit(f'unknown operation in --mix: {name}')
+        weights[name] = float(weight or 1)
+    return weights
+
+def op_upload(client, rng, job_id):
+    files = {'file': (f'resume-{rng.randrange(10 ** 9)}.txt', generate_resume(rng).encode())}
+    return client.request('POST', '/api/resumes/upload', files=files)
+
+def op_evaluate(client, rng, job_id):
+    return client.request('POST', '/api/evaluate', {'job_id': job_id})
+
+def op_results(client, rng, job_id):
+    return client.request('GET', f'/api/evaluate/{job_id}?top_k=20')
+
+def op_resumes(client, rng, job_id):
+    return client.request('GET', '/api/resumes')
+
+def op_jobs(client, rng, job_id):
+    return client.request('GET', '/api/jobs')
+
+def op_export(client, rng, job_id):
+    return client.request('GET', f'/api/evaluate/{job_id}/export')
+
+OPERATIONS = {
+    'upload': op_upload,
+    'evaluate': op_evaluate,
+    'results': op_results,
+    'resumes': op_resumes,
+    'jobs': op_jobs,
+    'export': op_export
+}
+
+def seed_request(send, expected_status, what):
+    """Send a seeding request, retrying lock errors: seeding is not measured"""
+    for attempt in range(SEED_RETRIES):
+        status, body = send()
+        if classify_error(status, body) != 'db_locked':
+            break
+        time.sleep(0.1 * 2 ** attempt)
+    if status != expected_status:
+        raise RuntimeError(f'seed {what} failed: {status} {body[:200]!r}')
+    return body
+
+def seed_user(base_url, index, args):
+    """Create one user with resumes and a job through the public routes"""
+    rng = random.Random(args.seed + index)
+    client = Client(base_url, args.timeout)
+    client.login(f'load{index}@example.com', 'load-test-password')
+    
+    for _ in range(args.resumes):
+        resume = generate_resume(rng).encode()
+        seed_request(lambda: client.request('POST', '/api/resumes/upload', files={'file': (f'seed-{index}.txt', resume)}), 201, 'upload')
+    
+    job = {'title': f'Load test {index}', 'description': generate_job(rng)}
+    job_id = json.loads(seed_request(lambda: client.request('POST', '/api/jobs', job), 201, 'job'))['id']
+    seed_request(lambda: client.request('POST', '/api/evaluate', {'job_id': job_id}), 200, 'evaluation')
+    return client, job_id
+
+def run_client(client, job_id, seed, weights, deadline, samples):
+    rng = random.Random(seed)
+    names = list(weights)
+    name_weights = list(weights.values())
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, weights=name_weights)[0]
+        started = time.perf_counter()
+        try:
+            status, body = OPERATIONS[name](client, rng, job_id)
+            error = classify_error(status, body)
+        except OSError:
+            error = 'connection'
+        samples.append((name, time.perf_counter() - started, error))
+
+def summarize(samples, duration):
+    """Per-endpoint and overall throughput, latency percentiles and errors"""
+    groups = {}
+    for name, elapsed, error in samples:
+        groups.setdefault(name, []).append((elapsed, error))
+    groups['all'] = [(elapsed, error) for _, elapsed, error in samples]
+    
+    report = {}
+    for name, entries in groups.items():
+        timings = sorted(elapsed for elapsed, error in entries if error is None)
+        errors = {}
+        for _, error in entries:
+            if error is not None:
+                errors[error] = errors.get(error, 0) + 1
+        report[name] = {
+            'requests': len(entries),
+            'throughput_rps': len(entries) / duration,
+            'p50_ms': percentile(timings, 0.50) * 1000 if timings else None,
+            'p95_ms': percentile(timings, 0.95) * 1000 if timings else None,
+            'p99_ms': percentile(timings, 0.99) * 1000 if timings else None,
+            'error_rate': sum(errors.values()) / len(entries) if entries else 0.0,
+            'errors': errors
+        }
+    return report
+
+def start_local_server(args, workdir):
+    """Start a threaded server in a subprocess and return (process, base_url)"""
+    command = [
+        sys.executable, '-m', 'benchmarks.load_test', '--serve',
+        '--profile', args.profile, '--workdir', workdir
+    ]
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    process = subprocess.Popen(command, cwd=backend_dir, stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    if not line.startswith('listening '):
+        process.kill()
+        raise RuntimeError('load test server failed to start')
+    return process, line.split()[1]
+
+def serve(args):
+    """Run the app on a free local port over a database in workdir"""
+    import logging
+    from werkzeug.serving import make_server
+    from app import create_app
+    from app.config import CONFIGS
+    from app.database import init_database
+    
+    config = type('LoadTestConfig', (CONFIGS[args.profile],), {
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(args.workdir, 'load.db'),
+        'UPLOAD_FOLDER': os.path.join(args.workdir, 'uploads'),
+        'INDEX_DIR': os.path.join(args.workdir, 'indexes')
+    })
+    app = create_app(config)
+    with app.app_context():
+        init_database()
+    
+    # Per-request access logs would dominate the run's output
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    print(f'listening http://127.0.0.1:{server.server_port}', flush=True)
+    server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='drive this running server instead of starting one locally')
+    parser.add_argument('--profile', default='development', choices=['development', 'production'], help='config of the locally started server')
+    parser.add_argument('--users', type=int, default=50, help='recruiters, one client thread each')
+    parser.add_argument('--resumes', type=int, default=20, help='resumes uploaded per user while seeding')
+    parser.add_argument('--duration', type=float, default=60, help='seconds of mixed load')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='comma-separated operation:weight pairs')
+    parser.add_argument('--timeout', type=float, default=60, help='seconds before a request counts as a connection error')
+    parser.add_argument('--seed', type=int, default=42, help='corpus generator seed')
+    parser.add_argument('--max-error-rate', type=float, help='fail when the overall error rate exceeds this fraction')
+    parser.add_argument('--max-p95-ms', type=float, help='fail when the overall p95 latency exceeds this')
+    parser.add_argument('--output', default='load_test_results.json', help='where to write the JSON results')
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--workdir', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    
+    if args.serve:
+        return serve(args)
+    
+    weights = parse_mix(args.mix)
+    workdir = None
+    process = None
+    base_url = args.url
+    try:
+        if base_url is None:
+            workdir = tempfile.mkdtemp(prefix='load-test-')
+            process, base_url = start_local_server(args, workdir)
+        
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=min(args.users, 16)) as executor:
+            accounts = list(executor.map(lambda index: seed_user(base_url, index, args), range(args.users)))
+        print(f'Seeded {args.users} users with {args.resumes} resumes each in {time.perf_counter() - started:.1f}s')
+        
+        samples = []
+        deadline = time.perf_counter() + args.duration
+        threads = [
+            threading.Thread(target=run_client, args=(client, job_id, args.seed + index, weights, deadline, samples))
+            for index, (client, job_id) in enumerate(accounts)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+        if workdir is not None:
+            shutil.rmtree(workdir, ignore_errors=True)
+    
+    results = summarize(samples, args.duration)
+    for name, stats in results.items():
+        latency = ' '.join(
+            f'{label} {stats[key]:8.1f}' if stats[key] is not None else f'{label} {"-":>8}'
+            for label, key in (('p50', 'p50_ms'), ('p95', 'p95_ms'), ('p99', 'p99_ms'))
+        )
+        errors = ', '.join(f'{kind} {count}' for kind, count in sorted(stats['errors'].items()))
+        print(f'{name:<9} {stats["requests"]:7} req {stats["throughput_rps"]:8.1f} req/s  {latency} ms  errors {stats["error_rate"]:.2%} {errors}')
+    
+    report = {
+        'meta': {
+            'created_at': datetime.utcnow().isoformat(),
+            'git_revision': git_revision(),
+            'python': sys.version.split()[0],
+            'cpu_count': os.cpu_count(),
+            'url': args.url,
+            'profile': None if args.url else args.profile,
+            'users': args.users,
+            'resumes': args.resumes,
+            'duration': args.duration,
+            'mix': weights,
+            'seed': args.seed
+        },
+        'results': results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'Wrote {args.output}')
+    
+    failures = []
+    overall = results['all']
+    if args.max_error_rate is not None and overall['error_rate'] > args.max_error_rate:
+        failures.append(f'error rate {overall["error_rate"]:.2%} above {args.max_error_rate:.2%}')
+    if args.max_p95_ms is not None and (overall['p95_ms'] is None or overall['p95_ms'] > args.max_p95_ms):
+        p95 = 'unknown' if overall['p95_ms'] is None else f'{overall["p95_ms"]:.1f}'
+        failures.append(f'p95 {p95} ms above {args.max_p95_ms:.1f} ms')
+    if failures:
+        print('FAILED: ' + '; '.join(failures))
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,368 @@
+"""
+Benchmark the NLP engine, text extraction and the evaluate API.
+
+Run from the backend directory:
+    
+    python -m benchmarks.run --sizes 100,1000,10000 --output results.json
+    python -m benchmarks.compare baseline.json results.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.corpus import generate_corpus, generate_job, generate_pdf
+
+def measure(func, repeat, setup=None):
+    """Time func over several runs, calling setup untimed before each one"""
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return {
+        'runs': timings,
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'mean': statistics.mean(timings)
+    }
+
+def bench_nlp(job, resumes, repeat):
+    from collections import Counter
+    from app.utils.nlp_engine import Vocabulary, tokenize, tokenize_ids, smooth_idf, score_term_vectors_idf
+    
+    def score_idf():
+        # Tokenize, weight against the pool's IDF and score, as the app does
+        # with stored vectors
+        vocabulary = Vocabulary()
+        resume_vectors = [Counter(tokenize_ids(text, vocabulary)) for text in resumes]
+        doc_counts = Counter(term for vector in resume_vectors for term in vector)
+        idf = {term: smooth_idf(count, len(resumes)) for term, count in doc_counts.items()}
+        job_vector = Counter(tokenize_ids(job, vocabulary))
+        return score_term_vectors_idf(resume_vectors, job_vector, idf, smooth_idf(0, len(resumes)))
+    
+    return {
+        'tokenize': measure(lambda: [tokenize(text) for text in resumes], repeat),
+        'score_idf': measure(score_idf, repeat)
+    }
+
+def synthetic_skills(count, seed):
+    """count made-up skills of one to three words, each with one alias"""
+    rng = random.Random(seed)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    word = lambda: ''.join(rng.choice(letters) for _ in range(rng.randint(3, 9)))
+    skills = {}
+    while len(skills) < count:
+        skills[' '.join(word() for _ in range(rng.randint(1, 3)))] = [word() + '.js']
+    return skills
+
+def bench_skills(resumes, repeat, seed, dictionary_sizes):
+    from app.utils.skill_matcher import DEFAULT_SKILLS_FILE, SkillMatcher, read_skills
+    
+    # Time per character should stay flat across pool and dictionary sizes
+    characters = sum(len(text) for text in resumes)
+    bundled = read_skills(DEFAULT_SKILLS_FILE)
+    results = {}
+    for size in dictionary_sizes:
+        skills = dict(synthetic_skills(max(size - len(bundled), 0), seed), **bundled)
+        started = time.perf_counter()
+        matcher = SkillMatcher(skills)
+        build_seconds = time.perf_counter() - started
+        
+        stats = measure(lambda: [matcher.count(text) for text in resumes], repeat)
+        stats['patterns'] = matcher.size
+        stats['build_seconds'] = build_seconds
+        stats['us_per_char'] = stats['median'] / characters * 1e6
+        results[f'skill_match_dict_{size}'] = stats
+    return results
+
+SEARCH_QUERIES = {
+    'and': 'kubernetes terraform',
+    'or': 'rust OR scala',
+    'not': 'python -java',
+    'prefix': 'kube*',
+    'phrase': '"docker kubernetes"'
+}
+
+def bench_search(resumes, repeat):
+    import sqlite3
+    from app.utils.search_index import CREATE_SEARCH_TABLE, INSERT_SEARCH_ROW, SEARCH_QUERY, build_match_expression
+    
+    # User 1 owns every resume but one in a hundred, the worst case for a
+    # scoped query; user 2 owns the rest, like one tenant among many
+    def build():
+        connection = sqlite3.connect(':memory:')
+        connection.execute(CREATE_SEARCH_TABLE.text)
+        connection.executemany(INSERT_SEARCH_ROW.text, (
+            {'id': i + 1, 'owner': 'u2' if i % 100 == 0 else 'u1', 'body': text} for i, text in enumerate(resumes)
+        ))
+        connection.commit()
+        return connection
+    
+    results = {'search_index_build': measure(build, 1)}
+    connection = build()
+    statement = SEARCH_QUERY.format(after='')
+    for name, query in SEARCH_QUERIES.items():
+        for suffix, user_id in (('', 1), ('_small_user', 2)):
+            params = {'match': build_match_expression(query, user_id), 'limit': 21}
+            results[f'search_{name}{suffix}'] = measure(lambda: connection.execute(statement, params).fetchall(), repeat)
+    connection.close()
+    return results
+
+def bench_matrix(resumes, repeat, job_count, seed):
+    from collections import Counter
+    from app.utils.nlp_engine import Vocabulary, tokenize_ids, smooth_idf, score_term_vectors_idf, score_matrix_idf
+    
+    rng = random.Random(seed)
+    jobs = [generate_job(rng) for _ in range(job_count)]
+    vocabulary = Vocabulary()
+    resume_vectors = [Counter(tokenize_ids(text, vocabulary)) for text in resumes]
+    job_vectors = [Counter(tokenize_ids(text, vocabulary)) for text in jobs]
+    doc_counts = Counter(term for vector in resume_vectors for term in vector)
+    idf = {term: smooth_idf(count, len(resumes)) for term, count in doc_counts.items()}
+    default_idf = smooth_idf(0, len(resumes))
+    
+    return {
+        f'score_idf_per_job_x{job_count}': measure(lambda: [score_term_vectors_idf(resume_vectors, vector, idf, default_idf) for vector in job_vectors], repeat),
+        f'score_matrix_idf_x{job_count}': measure(lambda: score_matrix_idf(resume_vectors, job_vectors, idf, default_idf), repeat)
+    }
+
+def bench_prefilter(resumes, repeat, job_count, seed, shortlist_sizes):
+    from collections import Counter
+    from app.config import Config
+    from app.utils.candidate_index import CandidateIndex
+    from app.utils.nlp_engine import Vocabulary, tokenize_ids, smooth_idf, score_term_vectors_idf
+    
+    rng = random.Random(seed)
+    jobs = [generate_job(rng) for _ in range(job_count)]
+    vocabulary = Vocabulary()
+    resume_vectors = [Counter(tokenize_ids(text, vocabulary)) for text in resumes]
+    job_vectors = [Counter(tokenize_ids(text, vocabulary)) for text in jobs]
+    doc_counts = Counter(term for vector in resume_vectors for term in vector)
+    idf = {term: smooth_idf(count, len(resumes)) for term, count in doc_counts.items()}
+    default_idf = smooth_idf(0, len(resumes))
+    indexed = list(enumerate(resume_vectors))
+    index = CandidateIndex.from_vectors(indexed)
+    
+    def top_ids(ids, scores, k=10):
+        ranked = sorted(zip(ids, scores), key=lambda item: (-item[1][0], item[0]))
+        return {resume_id for resume_id, _ in ranked[:k]}
+    
+    def exhaustive():
+        return [
+            top_ids(range(len(resume_vectors)), score_term_vectors_idf(resume_vectors, job_vector, idf, default_idf))
+            for job_vector in job_vectors
+        ]
+    
+    def prefiltered(limit):
+        tops = []
+        for job_vector in job_vectors:
+            job_weights = {term: count * idf.get(term, default_idf) for term, count in job_vector.items()}
+            shortlist = index.shortlist(job_weights, limit, Config.PREFILTER_QUERY_TERMS)
+            scores = score_term_vectors_idf([resume_vectors[i] for i in shortlist], job_vector, idf, default_idf)
+            tops.append(top_ids(shortlist, scores))
+        return tops
+    
+    # Warm-up cost of a worker: building the index versus mapping a saved one
+    workdir = tempfile.mkdtemp(prefix='bench-index-')
+    try:
+        path = os.path.join(workdir, 'user-1.idx')
+        index.save(path)
+        results = {
+            'candidate_index_build': measure(lambda: CandidateIndex.from_vectors(indexed), repeat),
+            'candidate_index_map': measure(lambda: CandidateIndex.load(path), repeat)
+        }
+        index = CandidateIndex.load(path)
+        
+        # Recall@10 of each shortlist size against the exhaustive ranking
+        expected = exhaustive()
+        results[f'score_exhaustive_x{job_count}'] = measure(exhaustive, repeat)
+        for limit in shortlist_sizes:
+            stats = measure(lambda limit=limit: prefiltered(limit), repeat)
+            found = prefiltered(limit)
+            stats['recall_at_10'] = sum(len(a & b) for a, b in zip(expected, found)) / sum(len(a) for a in expected)
+            results[f'score_prefilter_{limit}_x{job_count}'] = stats
+        return results
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def bench_extraction(resumes, repeat, sample_size):
+    from app.utils.file_handler import extract_text
+    
+    workdir = tempfile.mkdtemp(prefix='bench-extract-')
+    try:
+        files = {'txt': [], 'pdf': []}
+        for i, text in enumerate(resumes[:sample_size]):
+            txt_path = os.path.join(workdir, f'resume_{i}.txt')
+            with open(txt_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            files['txt'].append(txt_path)
+            
+            pdf_path = os.path.join(workdir, f'resume_{i}.pdf')
+            with open(pdf_path, 'wb') as f:
+                f.write(generate_pdf(text))
+            files['pdf'].append(pdf_path)
+        
+        return {
+            f'extract_text_{extension}': measure(lambda paths=paths, extension=extension: [extract_text(path, extension) for path in paths], repeat)
+            for extension, paths in files.items()
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def bench_api(job, resumes, repeat):
+    from app import create_app, db
+    from app.config import Config
+    from app.database import init_database
+    from app.models import User, Resume, Evaluation
+    from app.utils.hashing import text_hash
+    from app.utils.term_vectors import build_term_vector, assign_term_vector
+    
+    workdir = tempfile.mkdtemp(prefix='bench-api-')
+    config = type('BenchmarkConfig', (Config,), {
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(workdir, 'bench.db'),
+        'UPLOAD_FOLDER': os.path.join(workdir, 'uploads')
+    })
+    
+    try:
+        app = create_app(config)
+        with app.app_context():
+            init_database()
+        client = app.test_client()
+        client.post('/api/auth/register', json={'email': 'bench@example.com', 'password': 'benchmark'})
+        token = client.post('/api/auth/login', json={'email': 'bench@example.com', 'password': 'benchmark'}).get_json()['access_token']
+        headers = {'Authorization': f'Bearer {token}'}
+        job_id = client.post('/api/jobs', headers=headers, json={'title': 'Benchmark', 'description': job}).get_json()['id']
+        
+        with app.app_context():
+            user_id = User.query.filter_by(email='bench@example.com').first().id
+        
+        def add_resume(i, text):
+            resume = Resume(
+                user_id=user_id,
+                filename=f'resume_{i}.txt',
+                file_path=os.path.join(workdir, f'resume_{i}.txt'),
+                extracted_text=text,
+                text_hash=text_hash(text)
+            )
+            assign_term_vector(resume, build_term_vector(text))
+            db.session.add(resume)
+        
+        with app.app_context():
+            for i, text in enumerate(resumes):
+                add_resume(i, text)
+                if i % 500 == 499:
+                    db.session.commit()
+            db.session.commit()
+        
+        uploads = iter(range(len(resumes), len(resumes) * 2))
+        def upload_resume():
+            # One more resume changes the corpus IDF slightly, as an upload does
+            with app.app_context():
+                add_resume(next(uploads), resumes[0] + ' benchmark upload')
+                db.session.commit()
+        
+        def clear_evaluations():
+            with app.app_context():
+                Evaluation.query.filter_by(job_id=job_id).delete()
+                db.session.commit()
+        
+        def post_evaluate():
+            response = client.post('/api/evaluate', headers=headers, json={'job_id': job_id})
+            assert response.status_code == 200, response.get_json()
+        
+        def get_results(query=''):
+            response = client.get(f'/api/evaluate/{job_id}{query}', headers=headers)
+            assert response.status_code == 200, response.get_json()
+        
+        return {
+            'api_evaluate_full': measure(post_evaluate, repeat, setup=clear_evaluations),
+            'api_evaluate_incremental': measure(post_evaluate, repeat),
+            'api_evaluate_after_upload': measure(post_evaluate, repeat, setup=upload_resume),
+            'api_results_all': measure(get_results, repeat),
+            'api_results_top_50': measure(lambda: get_results('?top_k=50'), repeat)
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='100,1000,10000', help='comma-separated resume pool sizes')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per benchmark')
+    parser.add_argument('--seed', type=int, default=42, help='corpus generator seed')
+    parser.add_argument('--pdf-sample', type=int, default=20, help='files per extraction benchmark')
+    parser.add_argument('--matrix-jobs', type=int, default=20, help='jobs per matrix scoring benchmark')
+    parser.add_argument('--prefilter-sizes', default='50,200,1000', help='comma-separated shortlist sizes for the prefilter benchmark')
+    parser.add_argument('--skill-dictionary-sizes', default='1000,10000,100000', help='comma-separated skill dictionary sizes for the phrase matching benchmark')
+    parser.add_argument('--skip', default='', help='comma-separated groups to skip: nlp, skills, search, matrix, prefilter, extraction, api')
+    parser.add_argument('--output', default='benchmark_results.json', help='where to write the JSON results')
+    args = parser.parse_args(argv)
+    
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    skip = set(filter(None, args.skip.split(',')))
+    
+    results = {}
+    for size in sizes:
+        job, resumes = generate_corpus(size, seed=args.seed)
+        size_results = {}
+        if 'nlp' not in skip:
+            size_results.update(bench_nlp(job, resumes, args.repeat))
+        if 'skills' not in skip:
+            dictionary_sizes = [int(count) for count in args.skill_dictionary_sizes.split(',') if count]
+            size_results.update(bench_skills(resumes, args.repeat, args.seed, dictionary_sizes))
+        if 'search' not in skip:
+            size_results.update(bench_search(resumes, args.repeat))
+        if 'matrix' not in skip:
+            size_results.update(bench_matrix(resumes, args.repeat, args.matrix_jobs, args.seed))
+        if 'prefilter' not in skip:
+            shortlist_sizes = [int(limit) for limit in args.prefilter_sizes.split(',') if limit]
+            size_results.update(bench_prefilter(resumes, args.repeat, args.matrix_jobs, args.seed, shortlist_sizes))
+        if 'extraction' not in skip:
+            size_results.update(bench_extraction(resumes, args.repeat, args.pdf_sample))
+        if 'api' not in skip:
+            size_results.update(bench_api(job, resumes, args.repeat))
+        results[str(size)] = size_results
+        
+        for name, stats in size_results.items():
+            recall = f'  recall@10 {stats["recall_at_10"]:.3f}' if 'recall_at_10' in stats else ''
+            per_char = f'  {stats["us_per_char"]:.3f} us/char' if 'us_per_char' in stats else ''
+            print(f'{size:>7} {name:<28} median {stats["median"] * 1000:10.2f} ms{recall}{per_char}')
+    
+    report = {
+        'meta': {
+            'created_at': datetime.utcnow().isoformat(),
+            'git_revision': git_revision(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'repeat': args.repeat,
+            'seed': args.seed,
+            'pdf_sample': args.pdf_sample,
+            'matrix_jobs': args.matrix_jobs,
+            'prefilter_sizes': args.prefilter_sizes,
+            'skill_dictionary_sizes': args.skill_dictionary_sizes
+        },
+        'results': results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'Wrote {args.output}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,218 @@
+"""
+Startup benchmark: cold-start time of a worker and memory per worker with
+and without a preloaded app. Linux only (reads /proc).
+
+Run from the backend directory:
+
+    python -m benchmarks.startup --repeat 5 --workers 4 --output startup.json
+
+Cold start runs a fresh interpreter that imports and builds the app:
+
+    eager    the old startup: PyPDF2 and every SQL dialect imported up front
+             and the schema created on every create_app
+    lazy     create_app as it is now, with heavy imports deferred
+    wsgi     wsgi.py: the production app plus its warm-up, as the gunicorn
+             master runs it once with preload_app
+
+Worker memory forks --workers processes the way gunicorn does. Each handles
+a few requests and then reports its RSS, PSS and USS (private memory):
+
+    lazy     each worker builds its own app after the fork (no preload)
+    preload  the app is built and warmed up once before forking
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+from benchmarks.corpus import generate_resume
+from benchmarks.run import git_revision
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COLD_START = {
+    'eager': '''
+import PyPDF2, sqlalchemy.dialects.postgresql
+from app import create_app
+from app.database import init_database
+app = create_app()
+with app.app_context():
+    init_database()
+''',
+    'lazy': '''
+from app import create_app
+app = create_app()
+''',
+    'wsgi': '''
+import wsgi
+'''
+}
+
+INIT_SCHEMA = '''
+from app import create_app
+from app.database import init_database
+app = create_app()
+with app.app_context():
+    init_database()
+print(0)
+'''
+
+TIMED_SNIPPET = '''
+import json, time
+started = time.perf_counter()
+exec({code!r})
+print(json.dumps(time.perf_counter() - started))
+'''
+
+def benchmark_env(workdir):
+    env = dict(os.environ)
+    env.update({
+        'DATABASE_URL': 'sqlite:///' + os.path.join(workdir, 'startup.db'),
+        'INDEX_DIR': os.path.join(workdir, 'indexes'),
+        'APP_ENV': 'production',
+        'PYTHONDONTWRITEBYTECODE': '1'
+    })
+    return env
+
+def python(code, env):
+    output = subprocess.check_output([sys.executable, '-c', code], cwd=BACKEND_DIR, env=env, text=True)
+    return json.loads(output.strip().splitlines()[-1])
+
+def memory_stats(pid):
+    """RSS, PSS and USS of a process in MiB, from /proc/<pid>/smaps_rollup"""
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            name, _, value = line.partition(':')
+            if value.strip().endswith('kB'):
+                fields[name] = int(value.split()[0])
+    return {
+        'rss_mib': fields['Rss'] / 1024,
+        'pss_mib': fields['Pss'] / 1024,
+        'uss_mib': (fields['Private_Clean'] + fields['Private_Dirty']) / 1024
+    }
+
+def exercise(app, resume):
+    """Requests a fresh worker typically serves first"""
+    from app.utils.term_vectors import build_term_vector
+    
+    client = app.test_client()
+    client.post('/api/auth/register', json={'email': 'startup@example.com', 'password': 'benchmark'})
+    token = client.post('/api/auth/login', json={'email': 'startup@example.com', 'password': 'benchmark'}).get_json()['access_token']
+    headers = {'Authorization': f'Bearer {token}'}
+    client.get('/api/resumes', headers=headers)
+    client.get('/api/jobs', headers=headers)
+    with app.app_context():
+        build_term_vector(resume)
+
+def measure_workers(mode, workers, resume):
+    """Fork workers as gunicorn would and return each one's memory once all are warm"""
+    import gc
+    
+    def build():
+        import wsgi
+        return wsgi.app
+    
+    app = None
+    if mode == 'preload':
+        app = build()
+        gc.freeze()
+    
+    children = []
+    for _ in range(workers):
+        ready_read, ready_write = os.pipe()
+        exit_read, exit_write = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(ready_read)
+            os.close(exit_write)
+            exercise(app or build(), resume)
+            os.write(ready_write, b'1')
+            os.read(exit_read, 1)
+            os._exit(0)
+        os.close(ready_write)
+        os.close(exit_read)
+        children.append((pid, ready_read, exit_write))
+    
+    for _, ready_read, _ in children:
+        os.read(ready_read, 1)
+    stats = [memory_stats(pid) for pid, _, _ in children]
+    for pid, _, exit_write in children:
+        os.write(exit_write, b'1')
+        os.waitpid(pid, 0)
+    return {'workers': stats, 'parent': memory_stats(os.getpid())}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5, help='cold starts timed per mode')
+    parser.add_argument('--workers', type=int, default=4, help='workers forked per memory measurement')
+    parser.add_argument('--output', default='startup_results.json', help='where to write the JSON results')
+    parser.add_argument('--measure-workers', choices=['lazy', 'preload'], help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    
+    if args.measure_workers:
+        print(json.dumps(measure_workers(args.measure_workers, args.workers, generate_resume(random.Random(1)))))
+        return 0
+    
+    workdir = tempfile.mkdtemp(prefix='bench-startup-')
+    env = benchmark_env(workdir)
+    results = {}
+    try:
+        # The schema exists beforehand, as it would after a deploy's init-db
+        python(INIT_SCHEMA, env)
+        
+        for mode, code in COLD_START.items():
+            timings = [python(TIMED_SNIPPET.format(code=code), env) for _ in range(args.repeat)]
+            results[f'cold_start_{mode}'] = {
+                'runs': timings,
+                'min': min(timings),
+                'median': statistics.median(timings),
+                'mean': statistics.mean(timings)
+            }
+            print(f'cold start {mode:<8} median {results[f"cold_start_{mode}"]["median"] * 1000:8.1f} ms')
+        
+        for mode in ('lazy', 'preload'):
+            output = subprocess.check_output(
+                [sys.executable, '-m', 'benchmarks.startup', '--measure-workers', mode, '--workers', str(args.workers)],
+                cwd=BACKEND_DIR, env=env, text=True
+            )
+            measured = json.loads(output.strip().splitlines()[-1])
+            workers = measured['workers']
+            summary = {
+                name: statistics.mean(worker[name] for worker in workers)
+                for name in ('rss_mib', 'pss_mib', 'uss_mib')
+            }
+            summary['total_pss_mib'] = sum(worker['pss_mib'] for worker in workers) + measured['parent']['pss_mib']
+            summary['workers'] = workers
+            results[f'workers_{mode}'] = summary
+            print(
+                f'workers {mode:<8} per worker rss {summary["rss_mib"]:6.1f} pss {summary["pss_mib"]:6.1f} '
+                f'uss {summary["uss_mib"]:6.1f} MiB  total pss {summary["total_pss_mib"]:6.1f} MiB'
+            )
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    
+    report = {
+        'meta': {
+            'created_at': datetime.utcnow().isoformat(),
+            'git_revision': git_revision(),
+            'python': sys.version.split()[0],
+            'cpu_count': os.cpu_count(),
+            'repeat': args.repeat,
+            'workers': args.workers
+        },
+        'results': results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'Wrote {args.output}')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,28 @@
+import gc
+import multiprocessing
+import os
+
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+# Lets the app split per-host budgets, such as extraction processes, between workers
+os.environ['WEB_CONCURRENCY'] = str(workers)
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))  # evaluations of large pools run synchronously
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 0))  # recycle workers after this many requests, 0 = never
+max_requests_jitter = max_requests // 10
+
+# Build the app once in the master; workers are forked with it already
+# imported and warmed up, sharing those pages copy-on-write
+preload_app = True
+
+def pre_fork(server, worker):
+    # Move everything allocated so far out of the collector's reach, so
+    # collections in workers do not touch (and copy) the shared pages
+    gc.freeze()
+
+def post_fork(server, worker):
+    # Connections opened in the master must not be shared between workers
+    from app import db
+    with server.app.wsgi().app_context():
+        db.engine.dispose(close=False)
@@ -1,8 +1,12 @@
 import os
 from app import create_app
+from app.database import init_database
 
 app = create_app()
 
 if __name__ == '__main__':
+    # Development server only; production runs wsgi.py under gunicorn
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    with app.app_context():
+        init_database()
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,33 @@
+import os
+import pytest
+from app import create_app, db
+from app.config import Config
+from app.database import init_database
+
+@pytest.fixture
+def app(tmp_path):
+    """App on a fresh SQLite database in a temporary directory"""
+    class TestConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(tmp_path, 'test.db')
+        UPLOAD_FOLDER = os.path.join(tmp_path, 'uploads')
+        INDEX_DIR = os.path.join(tmp_path, 'indexes')
+    
+    app = create_app(TestConfig)
+    with app.app_context():
+        init_database()
+        yield app
+        db.session.remove()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def login(client):
+    """Register a user and return (user_id, auth headers) for them"""
+    def login(email='recruiter@example.com', password='test-password'):
+        client.post('/api/auth/register', json={'email': email, 'password': password})
+        data = client.post('/api/auth/login', json={'email': email, 'password': password}).get_json()
+        return data['user']['id'], {'Authorization': f"Bearer {data['access_token']}"}
+    return login
@@ -0,0 +1,72 @@
+import json
+from contextlib import contextmanager
+from sqlalchemy import event, insert
+from app import db
+from app.models import Evaluation, Job, Resume
+
+@contextmanager
+def count_queries():
+    """Count the SQL statements executed inside the block"""
+    statements = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+def seed_evaluated_pool(user_id, size):
+    """A job with size evaluated resumes, inserted in bulk; returns the job id"""
+    job = Job(user_id=user_id, title=f'Pool of {size}', description='python flask sql')
+    db.session.add(job)
+    db.session.flush()
+    
+    first_id = (db.session.query(db.func.max(Resume.id)).scalar() or 0) + 1
+    db.session.execute(insert(Resume), [
+        {'id': first_id + i, 'user_id': user_id, 'filename': f'resume-{i}.txt', 'file_path': f'/uploads/resume-{i}.txt', 'extracted_text': 'python flask sql'}
+        for i in range(size)
+    ])
+    db.session.execute(insert(Evaluation), [
+        {'job_id': job.id, 'resume_id': first_id + i, 'fit_score': (i * 37) % 100, 'matching_keywords': json.dumps(['python'])}
+        for i in range(size)
+    ])
+    db.session.commit()
+    return job.id
+
+def fetch_results(client, headers, job_id, **params):
+    with count_queries() as statements:
+        response = client.get(f'/api/evaluate/{job_id}', headers=headers, query_string=params)
+    assert response.status_code == 200
+    return response.get_json(), len(statements)
+
+def test_result_page_query_count_does_not_grow_with_pool(client, login):
+    small_user, small_headers = login('small@example.com')
+    large_user, large_headers = login('large@example.com')
+    small_job = seed_evaluated_pool(small_user, 50)
+    large_job = seed_evaluated_pool(large_user, 5000)
+    
+    small, small_queries = fetch_results(client, small_headers, small_job)
+    large, large_queries = fetch_results(client, large_headers, large_job)
+    
+    assert len(small['results']) == 50
+    assert len(large['results']) == 5000
+    assert large_queries == small_queries
+    
+    scores = [result['fit_score'] for result in large['results']]
+    assert scores == sorted(scores, reverse=True)
+    assert all(result['filename'].startswith('resume-') for result in large['results'])
+
+def test_paginated_result_page_query_count_does_not_grow_with_pool(client, login):
+    small_user, small_headers = login('small@example.com')
+    large_user, large_headers = login('large@example.com')
+    small_job = seed_evaluated_pool(small_user, 50)
+    large_job = seed_evaluated_pool(large_user, 5000)
+    
+    _, small_queries = fetch_results(client, small_headers, small_job, limit=20)
+    large, large_queries = fetch_results(client, large_headers, large_job, limit=20)
+    _, next_page_queries = fetch_results(client, large_headers, large_job, limit=20, cursor=large['next_cursor'])
+    
+    assert large_queries == small_queries == next_page_queries
@@ -0,0 +1,42 @@
+import random
+from collections import Counter
+from app.utils.nlp_engine import count_terms, tokenize
+from app.utils.skill_matcher import SkillMatcher, normalize_phrase
+
+SKILLS = {
+    'machine learning': ['ml'],
+    'kubernetes': ['k8s'],
+    'node.js': ['nodejs'],
+    'c++': []
+}
+
+WORDS = ['machine', 'learning', 'Machine-Learning', 'ML', 'k8s', 'Kubernetes', 'node.js', 'node', 'C++', 'c++11', 'the', 'python', '--', '_', 'é']
+
+def random_texts(count, seed=0):
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield rng.choice([' ', '  ', '\n', '-', ', ']).join(rng.choice(WORDS) for _ in range(rng.randrange(30)))
+
+def test_words_inside_a_skill_are_counted_once():
+    matcher = SkillMatcher(SKILLS)
+    counts = count_terms('Machine Learning (ML) on k8s, plus machine-learning', matcher)
+    assert counts == Counter({'machine learning': 3, 'kubernetes': 1, 'plus': 1})
+
+def test_words_outside_skills_are_still_counted():
+    matcher = SkillMatcher(SKILLS)
+    assert count_terms('machine shop learning curve', matcher) == Counter(tokenize('machine shop learning curve'))
+
+def blank_skills(text, matcher):
+    """Normalized text with every matched skill replaced by spaces"""
+    text = normalize_phrase(text)
+    for start, end, _ in matcher.matches(text):
+        text = text[:start] + ' ' * (end - start) + text[end:]
+    return text
+
+def test_count_terms_is_skills_plus_the_tokens_outside_them():
+    matcher = SkillMatcher(SKILLS)
+    empty = SkillMatcher({})
+    for text in random_texts(2000):
+        # Normalizing separators leaves the tokens unchanged
+        assert count_terms(text, empty) == Counter(tokenize(text)), repr(text)
+        assert count_terms(text, matcher) == Counter(tokenize(blank_skills(text, matcher))) + matcher.count(text), repr(text)
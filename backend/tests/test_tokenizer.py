@@ -0,0 +1,58 @@
+import random
+from app.utils.nlp_engine import (
+    MAX_TOKEN_LENGTH, STOP_WORDS, TOKEN_PATTERN, Vocabulary, preprocess_text, tokenize, tokenize_ids
+)
+
+# Mixed case, digits, punctuation, Unicode letters and spaces, and
+# characters whose lowercase form is ASCII (Kelvin sign, dotted capital I)
+ALPHABET = (
+    'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
+    ' \t\n\r.,;:!?-_/\\+#@()[]{}\'"'
+    'éÉßøÆçñüÖ   ΣσπЖжあ漢字Kİﬁ😀'
+)
+
+def reference_tokenize(text):
+    """tokenize as it was before the single-pass pattern, plus its length cap"""
+    words = preprocess_text(text).split()
+    return [w for w in words if w not in STOP_WORDS and 2 < len(w) <= MAX_TOKEN_LENGTH]
+
+def random_texts(count, seed=0):
+    rng = random.Random(seed)
+    words = list(STOP_WORDS) + ['python', 'node.js', 'C++', 'e-mail', 'AWS', 'ml', 'x' * MAX_TOKEN_LENGTH, 'y' * (MAX_TOKEN_LENGTH + 1)]
+    for _ in range(count):
+        if rng.random() < 0.5:
+            yield ''.join(rng.choice(ALPHABET) for _ in range(rng.randrange(200)))
+        else:
+            yield ' '.join(rng.choice(words + [rng.choice(ALPHABET) * rng.randrange(1, 5)]) for _ in range(rng.randrange(40)))
+
+def test_tokenize_matches_preprocess_split_filter():
+    for text in random_texts(5000):
+        assert tokenize(text) == reference_tokenize(text), repr(text)
+
+def test_token_pattern_finds_the_words_preprocess_text_keeps():
+    for text in random_texts(2000, seed=1):
+        expected = [w for w in preprocess_text(text).split() if 2 < len(w) <= MAX_TOKEN_LENGTH]
+        assert TOKEN_PATTERN.findall(text.lower()) == expected, repr(text)
+
+def test_tokenize_unicode_and_length_edges():
+    text = 'Café naïve SQL Server Straße Kubernetes İstanbul ' + 'a' * MAX_TOKEN_LENGTH + ' ' + 'b' * (MAX_TOKEN_LENGTH + 1)
+    assert tokenize(text) == reference_tokenize(text)
+    assert 'kubernetes' in tokenize(text)
+    assert 'a' * MAX_TOKEN_LENGTH in tokenize(text)
+    assert not any(token.startswith('b') for token in tokenize(text))
+
+def test_tokenize_ids_round_trips_through_vocabulary():
+    vocabulary = Vocabulary()
+    texts = list(random_texts(500, seed=2))
+    for text in texts:
+        ids = tokenize_ids(text, vocabulary)
+        assert ids.typecode == 'I'
+        assert [vocabulary.token(term_id) for term_id in ids] == tokenize(text)
+    
+    # Ids are dense, one per distinct token, and stable on a second pass
+    tokens = {token for text in texts for token in tokenize(text)}
+    assert len(vocabulary) == len(tokens)
+    assert sorted(vocabulary.get(token) for token in tokens) == list(range(len(tokens)))
+    for text in texts:
+        assert list(tokenize_ids(text, vocabulary)) == [vocabulary.get(token) for token in tokenize(text)]
+    assert len(vocabulary) == len(tokens)
@@ -0,0 +1,23 @@
+"""
+Production entry point, loaded once by the gunicorn master (preload_app) so
+that forked workers share the app, its imports and its compiled data:
+
+    flask --app wsgi.py init-db
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+import os
+from app import create_app
+from app.config import CONFIGS
+from app.utils.skill_matcher import current_skill_matcher
+
+app = create_app(CONFIGS[os.environ.get('APP_ENV', 'production')])
+
+def warm_up(app):
+    """Load what requests would otherwise load lazily in every worker"""
+    import PyPDF2  # noqa: F401
+    
+    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    with app.app_context():
+        current_skill_matcher()
+
+warm_up(app)
@@ -45,28 +45,21 @@ const EvaluationPage = () => {
     }
   };
 
-  const exportToCSV = () => {
-    if (!results || !results.results) return;
+  const exportToCSV = async () => {
+    if (!results || !results.job_id) return;
 
-    const headers = ['Filename', 'Fit Score', 'Matching Keywords'];
-    const rows = results.results.map(r => [
-      r.filename,
-      r.fit_score,
-      r.matching_keywords.join('; ')
-    ]);
-
-    const csvContent = [
-      headers.join(','),
-      ...rows.map(row => row.map(cell => `"${cell}"`).join(','))
-    ].join('\n');
-
-    const blob = new Blob([csvContent], { type: 'text/csv' });
-    const url = window.URL.createObjectURL(blob);
-    const a = document.createElement('a');
-    a.href = url;
-    a.download = `evaluation_${results.job_title}_${new Date().toISOString().split('T')[0]}.csv`;
-    a.click();
-    window.URL.revokeObjectURL(url);
+    try {
+      // The server streams the CSV, honouring the current score filter
+      const response = await evaluationAPI.exportCSV(results.job_id, minScore);
+      const url = window.URL.createObjectURL(response.data);
+      const a = document.createElement('a');
+      a.href = url;
+      a.download = `evaluation_${results.job_title}_${new Date().toISOString().split('T')[0]}.csv`;
+      a.click();
+      window.URL.revokeObjectURL(url);
+    } catch (err) {
+      setError('Failed to export results');
+    }
   };
 
   const filteredResults = results?.results.filter(r => r.fit_score >= minScore) || [];
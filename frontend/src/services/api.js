@@ -62,6 +62,10 @@ export const jobAPI = {
 export const evaluationAPI = {
   evaluate: (jobId) => api.post('/evaluate', { job_id: jobId }),
   getResults: (jobId) => api.get(`/evaluate/${jobId}`),
+  exportCSV: (jobId, minScore) => api.get(`/evaluate/${jobId}/export`, {
+    params: minScore ? { min_score: minScore } : {},
+    responseType: 'blob',
+  }),
 };
 
 export default api;